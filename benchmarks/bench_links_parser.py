@@ -0,0 +1,43 @@
+"""
+Micro-benchmark of link extraction from saved result listing pages.
+
+Usage:
+    python -m benchmarks.bench_links_parser <directory> [--number 100]
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+
+from src.service_layer.parser.links_parser import (
+    find_item_hrefs,
+    find_item_hrefs_with_soup,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--number", type=int, default=100)
+    args = parser.parse_args()
+
+    pages = [
+        path.read_text(encoding="utf-8")
+        for path in sorted(args.directory.glob("*.html"))
+    ]
+    for page in pages:
+        assert find_item_hrefs(page) == find_item_hrefs_with_soup(page)
+    for name, extractor in (
+        ("BeautifulSoup", find_item_hrefs_with_soup),
+        ("scanning", find_item_hrefs),
+    ):
+        elapsed = timeit.timeit(
+            lambda: [extractor(page) for page in pages], number=args.number
+        )
+        print(
+            f"{name:>13}: {elapsed / args.number / len(pages) * 1000:.3f} ms per page"
+        )
+
+
+if __name__ == "__main__":
+    main()
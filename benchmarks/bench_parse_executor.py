@@ -0,0 +1,65 @@
+"""
+Benchmark of parsing stored bulletins in a thread pool and in a process pool.
+
+Usage:
+    python -m benchmarks.bench_parse_executor <directory> [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from time import perf_counter
+
+from src.service_layer.parser.data_parser import parse_bulletin
+
+
+async def parse_all(executor: Executor, files: list[tuple[bytes, str]]) -> int:
+    """
+    Parses all files in the executor concurrently.
+
+    Returns:
+        int: Number of parsed trading results.
+    """
+    loop = asyncio.get_running_loop()
+    columns = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, parse_bulletin, data, name)
+            for data, name in files
+        )
+    )
+    return sum(len(column["exchange_product_id"]) for column in columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    files = [
+        (path.read_bytes(), path.name) for path in sorted(args.directory.glob("*.xls"))
+    ]
+    executors = {
+        "thread": lambda: ThreadPoolExecutor(max_workers=args.workers),
+        "process": lambda: ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=get_context("spawn")
+        ),
+    }
+    for name, create_executor in executors.items():
+        with create_executor() as executor:
+            # Warm up workers, so process start-up is not measured.
+            asyncio.run(parse_all(executor, files[: args.workers]))
+            t0 = perf_counter()
+            rows = asyncio.run(parse_all(executor, files))
+            elapsed = perf_counter() - t0
+        print(
+            f"{name:>7}: {len(files)} files, {rows} rows in {elapsed:.3f} s, "
+            f"{len(files) / elapsed:.1f} files/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark of rendering a page of trading results for GET /.
+
+Compares the former path (ORM entities, TradingResultSchema per row, cache
+encoding and response model validation) with selecting column tuples and
+serializing them once with pydantic-core. Synthetic results are saved in
+a transaction which is rolled back at the end, together with the schema
+if it is missing. The test database is used unless another one is given,
+so the production one is not locked or bloated.
+
+Usage:
+    python -m benchmarks.bench_read_path [--rows 10000] [--number 20] [--url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from datetime import date, timedelta
+from statistics import median
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache.coder import JsonCoder
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models import (
+    Base,
+    ORMDeliveryBasis,
+    ORMProduct,
+    ORMTradingResult,
+    test_dbh,
+)
+from src.models.schemas import TradingResultSchema
+from src.service_layer.commands import upsert_trading_results
+from src.service_layer.export import FastJSONResponse, rows_to_dicts
+from src.service_layer.queries import (
+    get_filtered_trading_results,
+    select_filtered_trading_results,
+)
+
+START = date(2030, 1, 1)
+PRODUCTS = 100
+
+
+def make_records(rows: int) -> list[dict]:
+    """
+    Creates trading results of PRODUCTS products for consecutive days.
+    """
+    return [
+        dict(
+            exchange_product_id=f"A{product:03}ABS025A",
+            exchange_product_name="Product",
+            oil_id=f"A{product:03}",
+            delivery_basis_id="ABS",
+            delivery_basis_name="Basis",
+            delivery_type_id="A",
+            volume=10,
+            total=100000,
+            count=1,
+            date=START + timedelta(days=day),
+        )
+        for day in range(rows // PRODUCTS)
+        for product in range(PRODUCTS)
+    ]
+
+
+async def orm_path(db: AsyncSession, end: date) -> bytes:
+    query = select_filtered_trading_results({}, START, end).with_only_columns(
+        ORMTradingResult,
+        ORMProduct.exchange_product_name,
+        ORMDeliveryBasis.delivery_basis_name,
+    )
+    results = (await db.execute(query)).all()
+    models = [
+        TradingResultSchema.model_validate(
+            {
+                **vars(result),
+                "exchange_product_name": product_name,
+                "delivery_basis_name": basis_name,
+            }
+        )
+        for result, product_name, basis_name in results
+    ]
+    JsonCoder.encode(models)
+    validated = TypeAdapter(list[TradingResultSchema]).validate_python(
+        jsonable_encoder(models)
+    )
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+async def lean_path(db: AsyncSession, end: date) -> bytes:
+    rows = await get_filtered_trading_results(db, {}, START, end)
+    return FastJSONResponse(rows_to_dicts(rows)).body
+
+
+async def measure(
+    name: str,
+    render: Callable[[AsyncSession, date], Awaitable[bytes]],
+    db: AsyncSession,
+    end: date,
+    number: int,
+) -> None:
+    await render(db, end)
+    timings = []
+    for _ in range(number):
+        db.expunge_all()
+        t0 = perf_counter()
+        await render(db, end)
+        timings.append(perf_counter() - t0)
+    db.expunge_all()
+    tracemalloc.start()
+    await render(db, end)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:>5}: {median(timings) * 1000:.1f} ms per request, "
+        f"{peak / 1024 / 1024:.1f} MiB peak allocations"
+    )
+
+
+async def main(rows: int, number: int, url: str) -> None:
+    records = make_records(rows)
+    end = records[-1]["date"]
+    dbh = test_dbh(url)
+    try:
+        async with dbh.session_factory() as db:
+            connection = await db.connection()
+            await connection.run_sync(Base.metadata.create_all)
+            await upsert_trading_results(db, records)
+            assert json.loads(await lean_path(db, end)) == json.loads(
+                await orm_path(db, end)
+            )
+            await measure("orm", orm_path, db, end, number)
+            await measure("lean", lean_path, db, end, number)
+            await db.rollback()
+    finally:
+        await dbh.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument(
+        "--url",
+        default=settings.db.test_url,
+        help="The database to benchmark, the test one by default.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.number, args.url))
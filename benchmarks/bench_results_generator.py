@@ -0,0 +1,111 @@
+"""
+Benchmark of conversion of parsed bulletins to trading results records.
+
+Compares the former per-row ``iloc`` conversion with the vectorized one
+on a synthetic backfill of bulletins.
+
+Usage:
+    python -m benchmarks.bench_results_generator [--files 500] [--rows 150]
+"""
+
+import argparse
+from time import perf_counter
+
+import pandas as pd
+
+from src.service_layer.parser.results_generator import (
+    BASIS_NAME_COLUMN,
+    COUNT_COLUMN,
+    PRODUCT_ID_COLUMN,
+    PRODUCT_NAME_COLUMN,
+    TOTAL_COLUMN,
+    VOLUME_COLUMN,
+    generate_trading_result_records,
+)
+from src.service_layer.utils import get_date_from_link
+
+
+def make_bulletin(rows: int) -> pd.DataFrame:
+    """
+    Creates DataFrame shaped like a parsed bulletin.
+
+    Args:
+        rows (int): Number of trading results rows.
+
+    Returns:
+        pd.DataFrame: Synthetic bulletin with section header and summary rows.
+    """
+    product_ids = [f"A{i % 900 + 100:03d}ABS{i % 100:03d}F" for i in range(rows)]
+    return pd.DataFrame(
+        {
+            PRODUCT_ID_COLUMN: [None, *product_ids, "Итого:", "Итого по секции:"],
+            PRODUCT_NAME_COLUMN: [None, *["Product"] * rows, None, None],
+            BASIS_NAME_COLUMN: [None, *["Basis"] * rows, None, None],
+            VOLUME_COLUMN: [None, *[120.0] * rows, None, None],
+            TOTAL_COLUMN: [None, *[8400000.0] * rows, None, None],
+            COUNT_COLUMN: [None, *[5.0] * rows, 1000.0, 1000.0],
+        }
+    )
+
+
+def legacy_records(data: pd.DataFrame, link: str) -> list[dict]:
+    """
+    Former per-row conversion kept for comparison.
+    """
+    records = []
+    for i in range(1, len(data) - 2):
+        row = data.iloc[i]
+        if pd.isna(row[VOLUME_COLUMN]) or row.apply(lambda x: "Итого" in str(x)).any():
+            continue
+        exchange_product_id = row[PRODUCT_ID_COLUMN]
+        records.append(
+            {
+                "exchange_product_id": exchange_product_id,
+                "exchange_product_name": row[PRODUCT_NAME_COLUMN],
+                "oil_id": exchange_product_id[:4],
+                "delivery_basis_id": exchange_product_id[4:7],
+                "delivery_basis_name": row[BASIS_NAME_COLUMN],
+                "delivery_type_id": exchange_product_id[-1],
+                "volume": int(row[VOLUME_COLUMN]),
+                "total": int(row[TOTAL_COLUMN]),
+                "count": int(row[COUNT_COLUMN]),
+                "date": get_date_from_link(link),
+            }
+        )
+    return records
+
+
+def run(converter, bulletins: list[tuple[pd.DataFrame, str]]) -> tuple[int, float]:
+    """
+    Converts all bulletins with the given converter.
+
+    Returns:
+        tuple[int, float]: Number of converted rows and elapsed seconds.
+    """
+    t0 = perf_counter()
+    rows = sum(len(converter(data, link)) for data, link in bulletins)
+    return rows, perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=150)
+    args = parser.parse_args()
+
+    bulletins = [
+        (make_bulletin(args.rows), f"oil_xls_2023{i % 12 + 1:02d}01162000.xls")
+        for i in range(args.files)
+    ]
+    for name, converter in (
+        ("per-row iloc", legacy_records),
+        ("vectorized", generate_trading_result_records),
+    ):
+        rows, elapsed = run(converter, bulletins)
+        print(
+            f"{name:>14}: {rows} rows in {elapsed:.3f} s, {rows / elapsed:,.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,19 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 config.set_main_option("sqlalchemy.url", str(settings.db.url))
 
+partitioned_tables = [
+    table.name
+    for table in target_metadata.sorted_tables
+    if table.dialect_options["postgresql"]["partition_by"]
+]
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Skip partitions of partitioned tables, they are not described by models."""
+    if type_ == "table" and reflected and compare_to is None:
+        return not any(name.startswith(f"{table}_") for table in partitioned_tables)
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -49,6 +62,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -56,7 +70,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,65 @@
+"""Add filter indexes to spimex_trading_results
+
+Revision ID: 81a253378a8c
+Revises: db6e9338ef3d
+Create Date: 2026-10-18 09:02:17.724091
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "81a253378a8c"
+down_revision: Union[str, None] = "db6e9338ef3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_spimex_trading_results_delivery_basis_id_date",
+        "spimex_trading_results",
+        ["delivery_basis_id", "date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spimex_trading_results_delivery_type_id_date",
+        "spimex_trading_results",
+        ["delivery_type_id", "date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spimex_trading_results_oil_id_date",
+        "spimex_trading_results",
+        ["oil_id", "date"],
+        unique=False,
+        postgresql_include=[
+            "exchange_product_id",
+            "exchange_product_name",
+            "delivery_basis_id",
+            "delivery_basis_name",
+            "delivery_type_id",
+            "volume",
+            "total",
+            "count",
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_spimex_trading_results_oil_id_date",
+        table_name="spimex_trading_results",
+    )
+    op.drop_index(
+        "ix_spimex_trading_results_delivery_type_id_date",
+        table_name="spimex_trading_results",
+    )
+    op.drop_index(
+        "ix_spimex_trading_results_delivery_basis_id_date",
+        table_name="spimex_trading_results",
+    )
@@ -0,0 +1,149 @@
+"""Partition spimex_trading_results by date
+
+Revision ID: 575830b52c34
+Revises: 81a253378a8c
+Create Date: 2026-10-18 09:04:55.441613
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "575830b52c34"
+down_revision: Union[str, None] = "81a253378a8c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "spimex_trading_results"
+OLD_TABLE = "spimex_trading_results_old"
+COLUMNS = (
+    "id, exchange_product_id, exchange_product_name, oil_id, delivery_basis_id, "
+    "delivery_basis_name, delivery_type_id, volume, total, count, "
+    "created_on, updated_on"
+)
+# Partitions of later years are created by the parser before loading results.
+YEARS = range(2023, 2028)
+
+
+def rename_to_old_table() -> None:
+    """Rename the table and free names of its sequence, constraints and indexes."""
+    op.rename_table(TABLE, OLD_TABLE)
+    op.execute(f"ALTER SEQUENCE {TABLE}_id_seq RENAME TO {OLD_TABLE}_id_seq")
+    for index in (
+        "ix_spimex_trading_results_date",
+        "ix_spimex_trading_results_oil_id_date",
+        "ix_spimex_trading_results_delivery_basis_id_date",
+        "ix_spimex_trading_results_delivery_type_id_date",
+    ):
+        op.drop_index(index, table_name=OLD_TABLE)
+    op.drop_constraint("exchange_product_id_date", OLD_TABLE, type_="unique")
+    op.drop_constraint(f"{TABLE}_pkey", OLD_TABLE, type_="primary")
+
+
+def create_table(date_type: sa.types.TypeEngine, primary_key: list[str], **kw) -> None:
+    """Create the table with its indexes."""
+    op.create_table(
+        TABLE,
+        sa.Column("exchange_product_id", sa.String(length=11), nullable=False),
+        sa.Column("exchange_product_name", sa.String(length=255), nullable=False),
+        sa.Column("oil_id", sa.String(length=4), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=3), nullable=False),
+        sa.Column("delivery_basis_name", sa.String(length=255), nullable=False),
+        sa.Column("delivery_type_id", sa.String(length=1), nullable=False),
+        sa.Column("volume", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("date", date_type, nullable=False),
+        sa.Column(
+            "created_on",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_on",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint(*primary_key),
+        sa.UniqueConstraint(
+            "exchange_product_id", "date", name="exchange_product_id_date"
+        ),
+        **kw,
+    )
+    op.create_index(
+        op.f("ix_spimex_trading_results_date"),
+        TABLE,
+        ["date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spimex_trading_results_delivery_basis_id_date",
+        TABLE,
+        ["delivery_basis_id", "date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spimex_trading_results_delivery_type_id_date",
+        TABLE,
+        ["delivery_type_id", "date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_spimex_trading_results_oil_id_date",
+        TABLE,
+        ["oil_id", "date"],
+        unique=False,
+        postgresql_include=[
+            "exchange_product_id",
+            "exchange_product_name",
+            "delivery_basis_id",
+            "delivery_basis_name",
+            "delivery_type_id",
+            "volume",
+            "total",
+            "count",
+        ],
+    )
+
+
+def copy_from_old_table(date_expression: str) -> None:
+    """Copy rows from the old table, restart the id sequence and drop the old table."""
+    op.execute(
+        f"INSERT INTO {TABLE} ({COLUMNS}, date) "
+        f"SELECT {COLUMNS}, {date_expression} FROM {OLD_TABLE}"
+    )
+    op.execute(
+        f"SELECT setval('{TABLE}_id_seq', "
+        f"coalesce((SELECT max(id) FROM {TABLE}), 0) + 1, false)"
+    )
+    op.drop_table(OLD_TABLE)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rename_to_old_table()
+    create_table(
+        sa.Date(),
+        ["id", "date"],
+        postgresql_partition_by="RANGE (date)",
+    )
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    for year in YEARS:
+        op.execute(
+            f"CREATE TABLE {TABLE}_y{year} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    copy_from_old_table("to_date(date, 'YYYYMMDD')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    rename_to_old_table()
+    create_table(sa.String(length=8), ["id"])
+    copy_from_old_table("to_char(date, 'YYYYMMDD')")
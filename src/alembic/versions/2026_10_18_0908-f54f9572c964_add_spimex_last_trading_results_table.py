@@ -0,0 +1,52 @@
+"""add spimex_last_trading_results table
+
+Revision ID: f54f9572c964
+Revises: 575830b52c34
+Create Date: 2026-10-18 09:08:28.448030
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f54f9572c964"
+down_revision: Union[str, None] = "575830b52c34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "exchange_product_id, exchange_product_name, oil_id, delivery_basis_id, "
+    "delivery_basis_name, delivery_type_id, volume, total, count, date"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spimex_last_trading_results",
+        sa.Column("exchange_product_id", sa.String(length=11), nullable=False),
+        sa.Column("exchange_product_name", sa.String(length=255), nullable=False),
+        sa.Column("oil_id", sa.String(length=4), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=3), nullable=False),
+        sa.Column("delivery_basis_name", sa.String(length=255), nullable=False),
+        sa.Column("delivery_type_id", sa.String(length=1), nullable=False),
+        sa.Column("volume", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        f"INSERT INTO spimex_last_trading_results ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM spimex_trading_results "
+        f"WHERE date = (SELECT max(date) FROM spimex_trading_results)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("spimex_last_trading_results")
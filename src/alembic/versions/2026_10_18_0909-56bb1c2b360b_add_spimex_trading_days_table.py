@@ -0,0 +1,45 @@
+"""add spimex_trading_days table
+
+Revision ID: 56bb1c2b360b
+Revises: f54f9572c964
+Create Date: 2026-10-18 09:09:20.216957
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "56bb1c2b360b"
+down_revision: Union[str, None] = "f54f9572c964"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spimex_trading_days",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("results_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "loaded_on",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("timezone('utc', now())"),
+            nullable=False,
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("date"),
+    )
+    op.execute(
+        "INSERT INTO spimex_trading_days (date, results_count) "
+        "SELECT date, count(*) FROM spimex_trading_results GROUP BY date"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("spimex_trading_days")
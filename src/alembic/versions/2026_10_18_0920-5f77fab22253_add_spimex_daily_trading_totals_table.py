@@ -0,0 +1,53 @@
+"""add spimex_daily_trading_totals table
+
+Revision ID: 5f77fab22253
+Revises: 56bb1c2b360b
+Create Date: 2026-10-18 09:20:07.303729
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5f77fab22253"
+down_revision: Union[str, None] = "56bb1c2b360b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIMENSIONS = "date, oil_id, delivery_basis_id, delivery_type_id"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spimex_daily_trading_totals",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("oil_id", sa.String(length=4), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=3), nullable=False),
+        sa.Column("delivery_type_id", sa.String(length=1), nullable=False),
+        sa.Column("volume", sa.BigInteger(), nullable=False),
+        sa.Column("total", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "date",
+            "oil_id",
+            "delivery_basis_id",
+            "delivery_type_id",
+            name="daily_trading_totals_date_oil_basis_type",
+        ),
+    )
+    op.execute(
+        f"INSERT INTO spimex_daily_trading_totals ({DIMENSIONS}, volume, total, count) "
+        f"SELECT {DIMENSIONS}, sum(volume), sum(total), sum(count) "
+        f"FROM spimex_trading_results GROUP BY {DIMENSIONS}"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("spimex_daily_trading_totals")
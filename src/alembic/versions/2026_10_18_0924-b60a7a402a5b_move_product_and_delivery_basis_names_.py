@@ -0,0 +1,132 @@
+"""move product and delivery basis names to dictionary tables
+
+Revision ID: b60a7a402a5b
+Revises: 5f77fab22253
+Create Date: 2026-10-18 09:24:15.502861
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b60a7a402a5b"
+down_revision: Union[str, None] = "5f77fab22253"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "spimex_trading_results"
+INDEX = "ix_spimex_trading_results_oil_id_date"
+INDEX_INCLUDE = [
+    "exchange_product_id",
+    "delivery_basis_id",
+    "delivery_type_id",
+    "volume",
+    "total",
+    "count",
+]
+# Dictionary tables with their key and name columns.
+DICTIONARIES = (
+    ("spimex_products", "exchange_product_id", "exchange_product_name"),
+    ("spimex_oils", "oil_id", None),
+    ("spimex_delivery_bases", "delivery_basis_id", "delivery_basis_name"),
+    ("spimex_delivery_types", "delivery_type_id", None),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "spimex_delivery_bases",
+        sa.Column("delivery_basis_id", sa.String(length=3), nullable=False),
+        sa.Column("delivery_basis_name", sa.String(length=255), nullable=False),
+        sa.Column("name_date", sa.Date(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("delivery_basis_id"),
+    )
+    op.create_table(
+        "spimex_delivery_types",
+        sa.Column("delivery_type_id", sa.String(length=1), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("delivery_type_id"),
+    )
+    op.create_table(
+        "spimex_oils",
+        sa.Column("oil_id", sa.String(length=4), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("oil_id"),
+    )
+    op.create_table(
+        "spimex_products",
+        sa.Column("exchange_product_id", sa.String(length=11), nullable=False),
+        sa.Column("exchange_product_name", sa.String(length=255), nullable=False),
+        sa.Column("name_date", sa.Date(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("exchange_product_id"),
+    )
+    for dictionary, key, name in DICTIONARIES:
+        if name is None:
+            op.execute(
+                f"INSERT INTO {dictionary} ({key}) "
+                f"SELECT DISTINCT {key} FROM {TABLE} ORDER BY {key}"
+            )
+            continue
+        op.execute(
+            f"INSERT INTO {dictionary} ({key}, {name}, name_date) "
+            f"SELECT DISTINCT ON ({key}) {key}, {name}, date FROM {TABLE} "
+            f"ORDER BY {key}, date DESC"
+        )
+    op.drop_index(INDEX, table_name=TABLE)
+    op.drop_column(TABLE, "delivery_basis_name")
+    op.drop_column(TABLE, "exchange_product_name")
+    op.create_index(
+        INDEX,
+        TABLE,
+        ["oil_id", "date"],
+        unique=False,
+        postgresql_include=INDEX_INCLUDE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX, table_name=TABLE)
+    op.add_column(
+        TABLE,
+        sa.Column("exchange_product_name", sa.VARCHAR(length=255), nullable=True),
+    )
+    op.add_column(
+        TABLE,
+        sa.Column("delivery_basis_name", sa.VARCHAR(length=255), nullable=True),
+    )
+    for dictionary, key, name in DICTIONARIES:
+        if name is None:
+            continue
+        op.execute(
+            f"UPDATE {TABLE} SET {name} = {dictionary}.{name} "
+            f"FROM {dictionary} WHERE {TABLE}.{key} = {dictionary}.{key}"
+        )
+        op.alter_column(TABLE, name, nullable=False)
+    op.create_index(
+        INDEX,
+        TABLE,
+        ["oil_id", "date"],
+        unique=False,
+        postgresql_include=[
+            "exchange_product_id",
+            "exchange_product_name",
+            "delivery_basis_id",
+            "delivery_basis_name",
+            *INDEX_INCLUDE[2:],
+        ],
+    )
+    op.drop_table("spimex_products")
+    op.drop_table("spimex_oils")
+    op.drop_table("spimex_delivery_types")
+    op.drop_table("spimex_delivery_bases")
@@ -0,0 +1,105 @@
+"""
+Offline bulk import of trading results from stored XLS files.
+
+Usage:
+    python -m src.bulk_import <directory or tarball> [--executor process] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import tarfile
+from pathlib import Path
+from time import time
+from typing import Iterator
+
+from src.config import settings
+from src.models import dbh
+from src.service_layer.cache import init_cache
+from src.service_layer.parser.data_parser import process_bulletins
+from src.service_layer.scheduler import create_partitions
+
+log = logging.getLogger(__name__)
+
+FILE_NAME_PATTERN = re.compile(r"oil_xls_\d{14}\.xls$")
+
+
+def read_bulletins(path: Path) -> Iterator[tuple[bytes, str]]:
+    """
+    Reads XLS files with trading results from the directory or the tarball.
+
+    Args:
+        path (Path): The directory or the tarball with oil_xls_YYYYMMDDhhmmss.xls files.
+
+    Yields:
+        tuple[bytes, str]: The XLS file data and its name.
+    """
+    if path.is_dir():
+        for file in sorted(path.iterdir()):
+            if FILE_NAME_PATTERN.match(file.name):
+                yield file.read_bytes(), file.name
+        return
+    with tarfile.open(path, "r:*") as tar:
+        for member in tar:
+            name = Path(member.name).name
+            if member.isfile() and FILE_NAME_PATTERN.match(name):
+                yield tar.extractfile(member).read(), name
+
+
+async def import_bulletins(path: Path) -> None:
+    """
+    Parses XLS files from the directory or the tarball and saves trading results.
+
+    Args:
+        path (Path): The directory or the tarball with XLS files.
+    """
+
+    async def produce(queue: asyncio.Queue) -> None:
+        # Files are read in a thread, so the loop keeps feeding the parsers.
+        bulletins = read_bulletins(path)
+        try:
+            while (item := await asyncio.to_thread(next, bulletins, None)) is not None:
+                log.info(f"Started reading {item[1]}")
+                await queue.put(item)
+        finally:
+            await asyncio.to_thread(bulletins.close)
+
+    t0 = time()
+    await process_bulletins(produce)
+    log.warning(
+        f"Imported trading results from {path}. Execution time {time() - t0:.3f} seconds."
+    )
+
+
+async def main(path: Path) -> None:
+    # The cache is initialized to invalidate responses for imported dates.
+    init_cache()
+    try:
+        await create_partitions()
+        await import_bulletins(path)
+    finally:
+        await dbh.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import trading results from a directory or a tarball of XLS files."
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--executor",
+        choices=["thread", "process"],
+        default="process",
+        help="Parse files in a thread or a process pool.",
+    )
+    parser.add_argument("--workers", type=int, default=settings.parser.parse_workers)
+    args = parser.parse_args()
+    settings.parser.parse_executor = args.executor
+    settings.parser.parse_workers = args.workers
+
+    logging.basicConfig(
+        level=settings.logging.log_level_value,
+        format=settings.logging.log_format,
+    )
+    asyncio.run(main(args.path))
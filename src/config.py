@@ -1,14 +1,17 @@
 import logging
 import os.path
+from datetime import date
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Sequence
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
 
 HOST = "https://spimex.com"
 RESULTS_URL = HOST + "/markets/oil_products/trades/results"
+START_DATE = date(2023, 1, 1)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = os.path.join(BASE_DIR, "logs")
@@ -25,6 +28,18 @@ class RunConfig(BaseModel):
     port: int = 8000
 
 
+class ApiConfig(BaseModel):
+    """
+    API settings.
+    """
+
+    page_size: int = config("API_PAGE_SIZE", cast=int, default=500)
+    max_page_size: int = config("API_MAX_PAGE_SIZE", cast=int, default=5000)
+    export_partition_size: int = config(
+        "API_EXPORT_PARTITION_SIZE", cast=int, default=1000
+    )
+
+
 class DatabaseConfig(BaseModel):
     """
     Database settings.
@@ -77,6 +92,65 @@ class RedisConfig(BaseModel):
     redis_url: str = f"redis://{REDIS_HOST}:{REDIS_PORT}"
 
 
+class CacheConfig(BaseModel):
+    """
+    Cache settings.
+    """
+
+    last_results_max_age: float = config(
+        "CACHE_LAST_RESULTS_MAX_AGE", cast=float, default=60
+    )
+    dictionaries_max_age: float = config(
+        "CACHE_DICTIONARIES_MAX_AGE", cast=float, default=3600
+    )
+    invalidation_max_days: int = config(
+        "CACHE_INVALIDATION_MAX_DAYS", cast=int, default=31
+    )
+    local_max_size: int = config(
+        "CACHE_LOCAL_MAX_SIZE", cast=int, default=64 * 1024 * 1024
+    )
+    local_max_age: float = config("CACHE_LOCAL_MAX_AGE", cast=float, default=300)
+    listen_retry_delay: float = config(
+        "CACHE_LISTEN_RETRY_DELAY", cast=float, default=1
+    )
+    lock_timeout: float = config("CACHE_LOCK_TIMEOUT", cast=float, default=10)
+    lock_poll_interval: float = config(
+        "CACHE_LOCK_POLL_INTERVAL", cast=float, default=0.05
+    )
+    warmup_queries: Sequence[str] = config(
+        "CACHE_WARMUP_QUERIES",
+        cast=CommaSeparatedStrings,
+        default="/last,/dates?days=10,/,/totals",
+    )
+
+
+class ParserConfig(BaseModel):
+    """
+    Parser settings.
+    """
+
+    batch_size: int = config("PARSER_BATCH_SIZE", cast=int, default=5000)
+    download_concurrency: int = config(
+        "PARSER_DOWNLOAD_CONCURRENCY", cast=int, default=10
+    )
+    download_retries: int = config("PARSER_DOWNLOAD_RETRIES", cast=int, default=3)
+    download_backoff: float = config("PARSER_DOWNLOAD_BACKOFF", cast=float, default=0.5)
+    download_timeout: float = config("PARSER_DOWNLOAD_TIMEOUT", cast=float, default=30)
+    keepalive_timeout: float = 30
+    parse_workers: int = config("PARSER_PARSE_WORKERS", cast=int, default=4)
+    parse_executor: Literal["thread", "process"] = config(
+        "PARSER_PARSE_EXECUTOR", default="thread"
+    )
+    pages_window: int = config("PARSER_PAGES_WINDOW", cast=int, default=8)
+    cache_dir: str = config(
+        "PARSER_CACHE_DIR", default=os.path.join(BASE_DIR, "cache", "bulletins")
+    )
+    cache_max_size: int = config(
+        "PARSER_CACHE_MAX_SIZE", cast=int, default=1024 * 1024 * 1024
+    )
+    cache_revalidate: bool = config("PARSER_CACHE_REVALIDATE", cast=bool, default=False)
+
+
 class Settings(BaseSettings):
     """
     Application base settings.
@@ -84,9 +158,12 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(extra="ignore")
     run: RunConfig = RunConfig()
+    api: ApiConfig = ApiConfig()
     db: DatabaseConfig = DatabaseConfig()
     logging: LoggingConfig = LoggingConfig()
     redis: RedisConfig = RedisConfig()
+    cache: CacheConfig = CacheConfig()
+    parser: ParserConfig = ParserConfig()
 
 
 settings = Settings()
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os.path
 from contextlib import asynccontextmanager
@@ -5,13 +6,11 @@ from contextlib import asynccontextmanager
 import uvicorn
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
-from redis import asyncio as aioredis
 
 from src.config import settings, LOG_DIR
 from src.models import dbh
 from src.routers import router
+from src.service_layer.cache import init_cache
 from src.service_layer.scheduler import add_jobs_to_scheduler
 
 log = logging.getLogger(__name__)
@@ -26,10 +25,8 @@ logging.basicConfig(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # startup
-    redis = aioredis.from_url(
-        settings.redis.redis_url, encoding="utf-8", decode_responses=True
-    )
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    cache_backend = init_cache()
+    cache_listener = asyncio.create_task(cache_backend.listen())
     scheduler = AsyncIOScheduler()
     try:
         scheduler = add_jobs_to_scheduler(scheduler)
@@ -38,6 +35,7 @@ async def lifespan(app: FastAPI):
         log.error(f"Error initializing scheduler: {e}.")
     # shutdown
     finally:
+        cache_listener.cancel()
         scheduler.shutdown()
         log.warning("Stop scheduler.")
         await dbh.dispose()
@@ -1,4 +1,26 @@
-__all__ = ("dbh", "Base", "ORMTradingResult", "test_dbh")
+__all__ = (
+    "dbh",
+    "Base",
+    "ORMDailyTradingTotal",
+    "ORMDeliveryBasis",
+    "ORMDeliveryType",
+    "ORMLastTradingResult",
+    "ORMOil",
+    "ORMProduct",
+    "ORMTradingDay",
+    "ORMTradingResult",
+    "test_dbh",
+)
 
-from src.models.adapters import Base, ORMTradingResult
+from src.models.adapters import (
+    Base,
+    ORMDailyTradingTotal,
+    ORMDeliveryBasis,
+    ORMDeliveryType,
+    ORMLastTradingResult,
+    ORMOil,
+    ORMProduct,
+    ORMTradingDay,
+    ORMTradingResult,
+)
 from src.models.database import dbh, test_dbh
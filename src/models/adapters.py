@@ -1,6 +1,17 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import UniqueConstraint, String, DateTime, text, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Date,
+    DateTime,
+    Index,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,17 +32,17 @@ class ORMTradingResult(Base):
     """
     Trading result model in database.
 
+    Names of products and delivery bases are stored in the dictionary tables.
+
     Attributes:
         exchange_product_id (str): The exchange product ID.
-        exchange_product_name (str): The exchange product name.
         oil_id (str): The oil ID.
         delivery_basis_id (str): The delivery basis ID.
-        delivery_basis_name (str): The delivery basis name.
         delivery_type_id (str): The delivery type ID.
         volume (int): The volume of contracts in tones.
         total (int): The total value of contracts in rubles.
         count (int): The count of contracts.
-        date (str): The date of trading.
+        date (date): The date of trading.
         created_on (datetime): The date and time when the result was created.
         updated_on (datetime): The date and time when the result was updated.
     """
@@ -42,18 +53,42 @@ class ORMTradingResult(Base):
         UniqueConstraint(
             "exchange_product_id", "date", name="exchange_product_id_date"
         ),
+        Index(
+            "ix_spimex_trading_results_oil_id_date",
+            "oil_id",
+            "date",
+            postgresql_include=[
+                "exchange_product_id",
+                "delivery_basis_id",
+                "delivery_type_id",
+                "volume",
+                "total",
+                "count",
+            ],
+        ),
+        Index(
+            "ix_spimex_trading_results_delivery_basis_id_date",
+            "delivery_basis_id",
+            "date",
+        ),
+        Index(
+            "ix_spimex_trading_results_delivery_type_id_date",
+            "delivery_type_id",
+            "date",
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+
     exchange_product_id: Mapped[str] = mapped_column(String(11))
-    exchange_product_name: Mapped[str] = mapped_column(String(255))
     oil_id: Mapped[str] = mapped_column(String(4))
     delivery_basis_id: Mapped[str] = mapped_column(String(3))
-    delivery_basis_name: Mapped[str] = mapped_column(String(255))
     delivery_type_id: Mapped[str] = mapped_column(String(1))
     volume: Mapped[int]
     total: Mapped[int]
     count: Mapped[int]
-    date: Mapped[str] = mapped_column(String(8), index=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
     created_on: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=text("timezone('utc', now())"),
@@ -63,3 +98,161 @@ class ORMTradingResult(Base):
         server_default=text("timezone('utc', now())"),
         onupdate=func.now(),
     )
+
+
+event.listen(
+    ORMTradingResult.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT"),
+)
+
+
+class ORMLastTradingResult(Base):
+    """
+    Snapshot of trading results for the latest trading day.
+
+    Refreshed at the end of each ingestion, so the latest results are read
+    without looking up the latest date in the trading results table.
+
+    Attributes:
+        exchange_product_id (str): The exchange product ID.
+        exchange_product_name (str): The exchange product name.
+        oil_id (str): The oil ID.
+        delivery_basis_id (str): The delivery basis ID.
+        delivery_basis_name (str): The delivery basis name.
+        delivery_type_id (str): The delivery type ID.
+        volume (int): The volume of contracts in tones.
+        total (int): The total value of contracts in rubles.
+        count (int): The count of contracts.
+        date (date): The date of trading.
+    """
+
+    __tablename__ = "spimex_last_trading_results"
+
+    exchange_product_id: Mapped[str] = mapped_column(String(11))
+    exchange_product_name: Mapped[str] = mapped_column(String(255))
+    oil_id: Mapped[str] = mapped_column(String(4))
+    delivery_basis_id: Mapped[str] = mapped_column(String(3))
+    delivery_basis_name: Mapped[str] = mapped_column(String(255))
+    delivery_type_id: Mapped[str] = mapped_column(String(1))
+    volume: Mapped[int]
+    total: Mapped[int]
+    count: Mapped[int]
+    date: Mapped[date] = mapped_column(Date)
+
+
+class ORMTradingDay(Base):
+    """
+    Trading day with saved trading results.
+
+    Attributes:
+        date (date): The date of trading.
+        results_count (int): The number of saved trading results of the day.
+        loaded_on (datetime): The date and time when results of the day were last saved.
+    """
+
+    __tablename__ = "spimex_trading_days"
+
+    date: Mapped[date] = mapped_column(Date, unique=True)
+    results_count: Mapped[int]
+    loaded_on: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("timezone('utc', now())"),
+    )
+
+
+class ORMDailyTradingTotal(Base):
+    """
+    Daily totals of trading results by oil, delivery basis and delivery type.
+
+    Updated for the dates of each saved batch of trading results.
+
+    Attributes:
+        date (date): The date of trading.
+        oil_id (str): The oil ID.
+        delivery_basis_id (str): The delivery basis ID.
+        delivery_type_id (str): The delivery type ID.
+        volume (int): The total volume of contracts in tones.
+        total (int): The total value of contracts in rubles.
+        count (int): The total count of contracts.
+    """
+
+    __tablename__ = "spimex_daily_trading_totals"
+
+    __table_args__ = (
+        UniqueConstraint(
+            "date",
+            "oil_id",
+            "delivery_basis_id",
+            "delivery_type_id",
+            name="daily_trading_totals_date_oil_basis_type",
+        ),
+    )
+
+    date: Mapped[date] = mapped_column(Date)
+    oil_id: Mapped[str] = mapped_column(String(4))
+    delivery_basis_id: Mapped[str] = mapped_column(String(3))
+    delivery_type_id: Mapped[str] = mapped_column(String(1))
+    volume: Mapped[int] = mapped_column(BigInteger)
+    total: Mapped[int] = mapped_column(BigInteger)
+    count: Mapped[int] = mapped_column(BigInteger)
+
+
+class ORMProduct(Base):
+    """
+    Exchange product dictionary.
+
+    Attributes:
+        exchange_product_id (str): The exchange product ID.
+        exchange_product_name (str): The latest exchange product name.
+        name_date (date): The trading date the name was taken from.
+    """
+
+    __tablename__ = "spimex_products"
+
+    exchange_product_id: Mapped[str] = mapped_column(String(11), unique=True)
+    exchange_product_name: Mapped[str] = mapped_column(String(255))
+    name_date: Mapped[date]
+
+
+class ORMOil(Base):
+    """
+    Oil dictionary.
+
+    Attributes:
+        oil_id (str): The oil ID.
+    """
+
+    __tablename__ = "spimex_oils"
+
+    oil_id: Mapped[str] = mapped_column(String(4), unique=True)
+
+
+class ORMDeliveryBasis(Base):
+    """
+    Delivery basis dictionary.
+
+    Attributes:
+        delivery_basis_id (str): The delivery basis ID.
+        delivery_basis_name (str): The latest delivery basis name.
+        name_date (date): The trading date the name was taken from.
+    """
+
+    __tablename__ = "spimex_delivery_bases"
+
+    delivery_basis_id: Mapped[str] = mapped_column(String(3), unique=True)
+    delivery_basis_name: Mapped[str] = mapped_column(String(255))
+    name_date: Mapped[date]
+
+
+class ORMDeliveryType(Base):
+    """
+    Delivery type dictionary.
+
+    Attributes:
+        delivery_type_id (str): The delivery type ID.
+    """
+
+    __tablename__ = "spimex_delivery_types"
+
+    delivery_type_id: Mapped[str] = mapped_column(String(1), unique=True)
@@ -1,9 +1,12 @@
-from datetime import datetime
+import datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class TradingResultSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     exchange_product_id: str = Field(max_length=11)
     exchange_product_name: str
     delivery_basis_name: str
@@ -14,3 +17,44 @@ class TradingResultSchema(BaseModel):
     oil_id: str = Field(max_length=4)
     delivery_basis_id: str = Field(3)
     delivery_type_id: str = Field(1)
+
+    @field_validator("date", mode="before")
+    @classmethod
+    def format_date(cls, value: datetime.date | str) -> str:
+        if isinstance(value, datetime.date):
+            return value.strftime("%Y%m%d")
+        return value
+
+
+TRADING_RESULT_SCHEMA_FIELDS = tuple(TradingResultSchema.model_fields)
+
+Dimension = Literal["date", "oil_id", "delivery_basis_id", "delivery_type_id"]
+
+DIMENSIONS: tuple[Dimension, ...] = (
+    "date",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_type_id",
+)
+
+
+class TradingTotalSchema(BaseModel):
+    date: str | None = Field(default=None, max_length=8)
+    oil_id: str | None = Field(default=None, max_length=4)
+    delivery_basis_id: str | None = Field(default=None, max_length=3)
+    delivery_type_id: str | None = Field(default=None, max_length=1)
+    volume: int
+    total: int
+    count: int
+    average_price: float | None
+
+
+class DeliveryBasisSchema(BaseModel):
+    delivery_basis_id: str = Field(max_length=3)
+    delivery_basis_name: str
+
+
+class DictionariesSchema(BaseModel):
+    oils: list[str]
+    delivery_bases: list[DeliveryBasisSchema]
+    delivery_types: list[str]
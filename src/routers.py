@@ -1,25 +1,77 @@
 import time
 from datetime import date
-from typing import Annotated
+from typing import Annotated, AsyncIterator, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.models import dbh
-from src.models.schemas import TradingResultSchema
+from src.models.schemas import (
+    DictionariesSchema,
+    TradingResultSchema,
+    TradingTotalSchema,
+)
+from src.service_layer.cache import (
+    DATED_NAMESPACE,
+    LATEST_NAMESPACE,
+    JSONResponseCoder,
+    LinkedJSONResponseCoder,
+    coalesced_cache,
+)
+from src.service_layer.export import (
+    COLUMNAR_FORMATS,
+    MEDIA_TYPES,
+    ExportFormat,
+    FastJSONResponse,
+    check_export_format,
+    export_trading_results,
+    negotiate_columnar_format,
+    rows_to_dicts,
+)
 from src.service_layer.queries import (
+    Dimension,
+    get_aggregated_trading_results,
     get_dates,
+    get_dictionaries,
     get_filtered_trading_results,
     get_last_results,
+    stream_filtered_trading_results,
+)
+from src.service_layer.utils import (
+    canonical_key_builder,
+    decode_cursor,
+    encode_cursor,
+    set_filters,
+    validate_dates_interval,
 )
-from src.service_layer.utils import set_filters, request_key_builder
 
 router = APIRouter(tags=["TradingResults"])
 
+COLUMNAR_RESPONSES = {
+    200: {
+        "content": {
+            MEDIA_TYPES[export_format]: {} for export_format in COLUMNAR_FORMATS
+        }
+    }
+}
+
+
+@router.get(
+    "/dictionaries",
+    summary="Oils, delivery bases and delivery types of saved trading results",
+    response_model=DictionariesSchema,
+)
+async def get_trading_dictionaries(
+    db: Annotated[AsyncSession, Depends(dbh.session_getter)],
+):
+    return await get_dictionaries(db=db)
+
 
 @router.get("/dates")
-@cache(key_builder=request_key_builder)
+@coalesced_cache(key_builder=canonical_key_builder, namespace=LATEST_NAMESPACE)
 async def get_last_trading_dates(
     db: Annotated[AsyncSession, Depends(dbh.session_getter)],
     days: int,
@@ -27,49 +79,254 @@ async def get_last_trading_dates(
     return await get_dates(db=db, days=days)
 
 
+async def stream_trading_results(
+    filters: dict[str, str],
+    start_date: date,
+    end_date: date,
+) -> AsyncIterator[Sequence[Row]]:
+    # The session is opened by the generator, since dependencies
+    # are closed before the response body is sent.
+    async with dbh.session_factory() as db:
+        async for partition in stream_filtered_trading_results(
+            db,
+            filters,
+            start_date,
+            end_date,
+            partition_size=settings.api.export_partition_size,
+        ):
+            yield partition
+
+
+def export_response(
+    request: Request,
+    partitions: AsyncIterator[Sequence[Row]],
+    export_format: ExportFormat,
+) -> StreamingResponse:
+    check_export_format(export_format)
+    compress = export_format != "parquet" and "gzip" in request.headers.get(
+        "accept-encoding", ""
+    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="trading_results.{export_format}"'
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_trading_results(partitions, export_format, compress),
+        media_type=MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+@coalesced_cache(
+    key_builder=canonical_key_builder,
+    namespace=DATED_NAMESPACE,
+    coder=LinkedJSONResponseCoder,
+)
+async def get_dynamics_page(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    filters: dict[str, str],
+    start_date: date,
+    end_date: date,
+    cursor: str | None,
+    limit: int,
+) -> Response:
+    results = await get_filtered_trading_results(
+        db=db,
+        filters=filters,
+        start_date=start_date,
+        end_date=end_date,
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit + 1,
+    )
+    if not results and not cursor:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Trading results for given parameters not found",
+        )
+    headers = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1].date, results[-1].exchange_product_id)
+        # The link is relative, since cached pages are shared by requests
+        # with equal parameters sent to any host.
+        next_page = request.url.include_query_params(cursor=next_cursor)
+        headers = {"Link": f'<{next_page.path}?{next_page.query}>; rel="next"'}
+    return FastJSONResponse(rows_to_dicts(results), headers=headers)
+
+
+def with_cache_headers(result: Response, response: Response) -> Response:
+    # Headers set by the cache decorator go to the injected response,
+    # which is not used when a response is returned.
+    if result is not response:
+        result.headers.update(response.headers)
+    return result
+
+
 @router.get(
     "/",
     summary="The list of trading results matching the given parameters for a certain period",
+    description="The link to the next page is sent in the Link header.",
     response_model=list[TradingResultSchema],
+    responses=COLUMNAR_RESPONSES,
 )
-@cache(key_builder=request_key_builder)
 async def get_dynamics(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(dbh.session_getter)],
     oil_id: str | None = None,
     delivery_type_id: str | None = None,
     delivery_basis_id: str | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
+    cursor: str | None = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.api.max_page_size)
+    ] = settings.api.page_size,
 ):
     filters = set_filters(oil_id, delivery_type_id, delivery_basis_id)
-    results = await get_filtered_trading_results(
-        db=db, filters=filters, start_date=start_date, end_date=end_date
-    )
-    if not results:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Trading results for given parameters not found",
+    start_date, end_date = validate_dates_interval(start_date, end_date)
+    if export_format := negotiate_columnar_format(request.headers.get("accept", "")):
+        # Columnar formats are streamed for the whole period and not cached.
+        return export_response(
+            request,
+            stream_trading_results(filters, start_date, end_date),
+            export_format,
         )
-    return results
+    result = await get_dynamics_page(
+        request=request,
+        response=response,
+        db=db,
+        filters=filters,
+        start_date=start_date,
+        end_date=end_date,
+        cursor=cursor,
+        limit=limit,
+    )
+    return with_cache_headers(result, response)
+
+
+@router.get(
+    "/export",
+    summary="Stream trading results matching the given parameters for a certain period",
+    response_class=StreamingResponse,
+)
+async def export_dynamics(
+    request: Request,
+    oil_id: str | None = None,
+    delivery_type_id: str | None = None,
+    delivery_basis_id: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    export_format: Annotated[ExportFormat | None, Query(alias="format")] = None,
+):
+    filters = set_filters(oil_id, delivery_type_id, delivery_basis_id)
+    start_date, end_date = validate_dates_interval(start_date, end_date)
+    export_format = (
+        export_format
+        or negotiate_columnar_format(request.headers.get("accept", ""))
+        or "ndjson"
+    )
+    return export_response(
+        request, stream_trading_results(filters, start_date, end_date), export_format
+    )
+
+
+@coalesced_cache(
+    key_builder=canonical_key_builder,
+    namespace=LATEST_NAMESPACE,
+    coder=JSONResponseCoder,
+)
+async def get_last_results_list(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    filters: dict[str, str],
+) -> Response:
+    results = await get_last_results(db=db, filters=filters)
+    return FastJSONResponse(rows_to_dicts(results))
 
 
 @router.get(
     "/last",
     summary="Last trading results matching the given parameters",
     response_model=list[TradingResultSchema],
+    responses=COLUMNAR_RESPONSES,
 )
-@cache(key_builder=request_key_builder)
 async def get_trading_results(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(dbh.session_getter)],
     oil_id: str | None = None,
     delivery_type_id: str | None = None,
     delivery_basis_id: str | None = None,
 ):
     filters = set_filters(oil_id, delivery_type_id, delivery_basis_id)
-    results = await get_last_results(db=db, filters=filters)
-    if results is None:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Trading results for given parameters not found",
-        )
-    return results
+    if export_format := negotiate_columnar_format(request.headers.get("accept", "")):
+        results = await get_last_results(db=db, filters=filters)
+
+        async def partitions():
+            yield results
+
+        return export_response(request, partitions(), export_format)
+    result = await get_last_results_list(
+        request=request, response=response, db=db, filters=filters
+    )
+    return with_cache_headers(result, response)
+
+
+@coalesced_cache(
+    key_builder=canonical_key_builder,
+    namespace=DATED_NAMESPACE,
+    coder=JSONResponseCoder,
+)
+async def get_totals_list(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    group_by: list[Dimension],
+    filters: dict[str, str],
+    start_date: date,
+    end_date: date,
+) -> Response:
+    results = await get_aggregated_trading_results(
+        db=db,
+        group_by=group_by,
+        filters=filters,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return FastJSONResponse(rows_to_dicts(results))
+
+
+@router.get(
+    "/totals",
+    summary="Totals of trading results grouped by the given dimensions for a certain period",
+    response_model=list[TradingTotalSchema],
+    response_model_exclude_none=True,
+)
+async def get_totals(
+    request: Request,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(dbh.session_getter)],
+    group_by: Annotated[list[Dimension], Query()] = ["date"],
+    oil_id: str | None = None,
+    delivery_type_id: str | None = None,
+    delivery_basis_id: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    filters = set_filters(oil_id, delivery_type_id, delivery_basis_id)
+    start_date, end_date = validate_dates_interval(start_date, end_date)
+    result = await get_totals_list(
+        request=request,
+        response=response,
+        db=db,
+        group_by=group_by,
+        filters=filters,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return with_cache_headers(result, response)
@@ -0,0 +1,567 @@
+import asyncio
+import json
+import logging
+import math
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import date, timedelta
+from functools import wraps
+from time import monotonic
+from typing import Any, Awaitable, Callable, Iterable, get_type_hints
+
+from fastapi.responses import Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder, JsonCoder
+from fastapi_cache.decorator import cache
+from fastapi_cache.types import Backend, KeyBuilder
+from redis import asyncio as aioredis
+
+from src.config import settings
+from src.service_layer.snapshots import Snapshot, snapshots
+from src.service_layer.utils import date_bucket
+
+log = logging.getLogger(__name__)
+
+# Namespace of responses for periods of trading results, split by end dates.
+DATED_NAMESPACE = "trading-results"
+# Namespace of responses depending on the latest loaded trading results.
+LATEST_NAMESPACE = "latest"
+# Redis channel of invalidation messages for in-process caches of workers.
+INVALIDATION_CHANNEL = "fastapi-cache:invalidate"
+# Deletes the lock only if it is still held by the worker.
+UNLOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Key of the response being computed on a cache miss, set by the key builder.
+current_cache_key: ContextVar[str | None] = ContextVar(
+    "current_cache_key", default=None
+)
+# Key of a response shared by the call which computed or stored it, so it is
+# not written to the cache again.
+stored_cache_key: ContextVar[str | None] = ContextVar("stored_cache_key", default=None)
+# Futures of responses being computed in the process by their cache keys.
+flights: dict[str, asyncio.Future] = {}
+
+
+class JSONResponseCoder(JsonCoder):
+    """
+    Coder caching bodies of JSON responses as they are.
+
+    Cached bodies are returned as responses without decoding, so cache hits
+    are not parsed and validated by the response model again.
+    """
+
+    @classmethod
+    def decode_as_type(cls, value: bytes | str, *, type_: Any) -> Response:
+        return Response(content=value, media_type="application/json")
+
+
+class LinkedJSONResponseCoder(JSONResponseCoder):
+    """
+    Coder caching bodies of JSON responses together with their Link header.
+
+    The header is stored on the first line followed by the body, which is
+    rendered without new lines.
+    """
+
+    @classmethod
+    def encode(cls, value: Response) -> bytes:
+        return f"{value.headers.get('link', '')}\n".encode() + value.body
+
+    @classmethod
+    def decode_as_type(cls, value: bytes | str, *, type_: Any) -> Response:
+        if isinstance(value, str):
+            value = value.encode()
+        link, body = value.split(b"\n", 1)
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"Link": link.decode()} if link else None,
+        )
+
+
+class LocalCache:
+    """
+    In-process LRU cache of values with a bounded total size.
+
+    Entries expire after max_age seconds or with the value in the shared cache,
+    whichever is earlier. When the total size of values exceeds max_size,
+    the least recently used entries are evicted. Strings are sized by their
+    UTF-8 encoding, since Redis returns decoded values.
+    """
+
+    def __init__(self, max_size: int, max_age: float):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int): The maximum total size of cached values in bytes.
+            max_age (float): The maximum age of an entry in seconds.
+        """
+        self.max_size = max_size
+        self.max_age = max_age
+        self.size = 0
+        # Key: (value, size in bytes, expiration time,
+        # expiration time in the shared cache or None).
+        self._entries: OrderedDict[
+            str, tuple[bytes | str, int, float, float | None]
+        ] = OrderedDict()
+
+    def get(self, key: str) -> tuple[int, bytes | str] | None:
+        """
+        Reads the value and moves it to the end of the eviction queue.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            tuple[int, bytes | str] | None: Seconds left until the value expires
+                in the shared cache (-1 if it does not) and the value, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, _, expires_at, shared_expires_at = entry
+        now = monotonic()
+        if expires_at <= now:
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        if shared_expires_at is None:
+            return -1, value
+        return math.ceil(shared_expires_at - now), value
+
+    def set(self, key: str, value: bytes | str, ttl: int | None = None) -> None:
+        """
+        Stores the value and evicts the least recently used values if needed.
+
+        Args:
+            key (str): The cache key.
+            value (bytes | str): The value.
+            ttl (int | None): Seconds left until the value expires in the shared
+                cache, None or a negative number if it does not.
+        """
+        size = len(value.encode()) if isinstance(value, str) else len(value)
+        if self.max_age <= 0 or size > self.max_size:
+            return
+        now = monotonic()
+        expires_at = now + self.max_age
+        shared_expires_at = None
+        if ttl is not None and ttl >= 0:
+            shared_expires_at = now + ttl
+            expires_at = min(expires_at, shared_expires_at)
+        self._pop(key)
+        self._entries[key] = (value, size, expires_at, shared_expires_at)
+        self.size += size
+        while self.size > self.max_size:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        """
+        Removes values of the namespace or the key, or all values.
+
+        Args:
+            namespace (str | None): The namespace, keys of which start with "namespace:".
+            key (str | None): The cache key.
+
+        Returns:
+            int: Number of removed values.
+        """
+        if namespace:
+            keys = [k for k in self._entries if k.startswith(f"{namespace}:")]
+        elif key:
+            keys = [key] if key in self._entries else []
+        else:
+            keys = list(self._entries)
+        for k in keys:
+            self._pop(k)
+        return len(keys)
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+class TwoTierBackend(Backend):
+    """
+    Cache backend keeping recently used values of a shared backend in process.
+
+    Values are read from the local cache first and from the shared backend
+    on a local miss. Clearing the cache is published to the Redis channel,
+    so workers listening to it remove the same values from their local caches.
+    Invalidation of in-process snapshots is published to the same channel.
+    """
+
+    def __init__(
+        self,
+        shared: Backend,
+        local: LocalCache,
+        redis: aioredis.Redis | None = None,
+        channel: str = INVALIDATION_CHANNEL,
+    ):
+        """
+        Initializes the backend.
+
+        Args:
+            shared (Backend): The backend shared by workers.
+            local (LocalCache): The in-process cache.
+            redis (aioredis.Redis | None): The Redis client to publish and receive
+                invalidation messages with, None to keep invalidation local.
+            channel (str): The Redis channel of invalidation messages.
+        """
+        self.shared = shared
+        self.local = local
+        self.redis = redis
+        self.channel = channel
+        self.worker_id = uuid.uuid4().hex
+        self.locks: set[str] = set()
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | str | None]:
+        if (cached := self.local.get(key)) is not None:
+            return cached
+        ttl, value = await self.shared.get_with_ttl(key)
+        if value is not None:
+            self.local.set(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | str | None:
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        if stored_cache_key.get() == key:
+            return
+        await self.shared.set(key, value, expire)
+        self.local.set(key, value, expire)
+        await self.unlock(key)
+
+    async def lock(self, key: str) -> bool:
+        """
+        Takes the lock of computing the value of the key among workers.
+
+        The lock expires after settings.cache.lock_timeout seconds and is
+        released when the value is set.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            bool: True if the lock is taken, there is no Redis client or Redis
+                fails, so the value is computed without the lock. False if
+                another worker holds it.
+        """
+        if self.redis is None:
+            return True
+        try:
+            locked = await self.redis.set(
+                f"{key}:lock",
+                self.worker_id,
+                nx=True,
+                px=int(settings.cache.lock_timeout * 1000),
+            )
+        except Exception as e:
+            log.warning(f"Error locking cache key {key}: {e}.")
+            return True
+        if locked:
+            self.locks.add(key)
+        return bool(locked)
+
+    async def unlock(self, key: str) -> None:
+        """
+        Releases the lock of the key if the worker holds it.
+
+        Args:
+            key (str): The cache key.
+        """
+        if key in self.locks:
+            self.locks.discard(key)
+            try:
+                await self.redis.eval(UNLOCK_SCRIPT, 1, f"{key}:lock", self.worker_id)
+            except Exception as e:
+                # The lock expires by itself.
+                log.warning(f"Error unlocking cache key {key}: {e}.")
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        count = await self.shared.clear(namespace, key)
+        self.local.clear(namespace, key)
+        await self.publish({"namespace": namespace, "key": key})
+        return count
+
+    async def publish(self, message: dict) -> None:
+        """
+        Publishes the invalidation message to other workers if Redis is used.
+
+        Args:
+            message (dict): The message without the ID of the worker.
+        """
+        if self.redis is not None:
+            await self.redis.publish(
+                self.channel, json.dumps({"worker_id": self.worker_id, **message})
+            )
+
+    def receive(self, message: str) -> None:
+        """
+        Removes values or snapshots named in an invalidation message of another worker.
+
+        Args:
+            message (str): The JSON message published by clear or invalidate_snapshots.
+        """
+        data = json.loads(message)
+        if data["worker_id"] == self.worker_id:
+            return
+        if "snapshot" in data:
+            if (snapshot := snapshots.get(data["snapshot"])) is not None:
+                snapshot.invalidate()
+        else:
+            self.local.clear(data["namespace"], data["key"])
+
+    def clear_local(self) -> None:
+        """
+        Empties the local cache and invalidates snapshots of the process.
+        """
+        self.local.clear()
+        for snapshot in snapshots.values():
+            snapshot.invalidate()
+
+    async def listen(self) -> None:
+        """
+        Receives invalidation messages of other workers until cancelled.
+
+        The local cache and snapshots are emptied on each subscription, since
+        messages published while the worker was not subscribed are lost.
+        """
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.clear_local()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Error receiving cache invalidation messages: {e}.")
+                self.clear_local()
+                await asyncio.sleep(settings.cache.listen_retry_delay)
+            finally:
+                await pubsub.reset()
+
+
+async def compute_once(
+    key: str,
+    func: Callable[..., Awaitable[Any]],
+    coder: type[Coder],
+    return_type: Any,
+    *args,
+    **kwargs,
+) -> Any:
+    """
+    Computes the value of the key unless another worker is computing it.
+
+    When the lock of the key is held by another worker, the value is awaited
+    in the cache until the lock times out. The value read from the cache is
+    marked as stored, so TwoTierBackend does not write it again.
+
+    Args:
+        key (str): The cache key.
+        func (Callable): The cached function.
+        coder (type[Coder]): The coder of cached values.
+        return_type (Any): The return type of the function to decode the value as.
+        *args: Positional arguments of the function.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+    """
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TwoTierBackend):
+        deadline = monotonic() + settings.cache.lock_timeout
+        while not await backend.lock(key) and monotonic() < deadline:
+            await asyncio.sleep(settings.cache.lock_poll_interval)
+            try:
+                value = await backend.get(key)
+            except Exception as e:
+                log.warning(f"Error reading cache key {key}: {e}.")
+                break
+            if value is not None:
+                stored_cache_key.set(key)
+                return coder.decode_as_type(value, type_=return_type)
+    try:
+        return await func(*args, **kwargs)
+    except BaseException:
+        if isinstance(backend, TwoTierBackend):
+            await backend.unlock(key)
+        raise
+
+
+def single_flight(
+    func: Callable[..., Awaitable[Any]], coder: type[Coder]
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Makes concurrent calls of the cached function on a cache miss share one result.
+
+    The first call with the cache key computes the result, the others await it
+    and get copies decoded from the encoded result. The copies are marked as
+    stored, so TwoTierBackend does not write them to the cache again.
+
+    Args:
+        func (Callable): The cached function.
+        coder (type[Coder]): The coder of cached values.
+
+    Returns:
+        Callable: The function computing each missing value once.
+    """
+    return_type = get_type_hints(func).get("return")
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = current_cache_key.get()
+        if key is None:
+            return await func(*args, **kwargs)
+        while (flight := flights.get(key)) is not None:
+            try:
+                result = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The computing request was cancelled, compute the result again.
+                continue
+            stored_cache_key.set(key)
+            return coder.decode_as_type(coder.encode(result), type_=return_type)
+        flight = asyncio.get_running_loop().create_future()
+        # The exception is retrieved, so it is not logged when nobody awaits it.
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        flights[key] = flight
+        try:
+            result = await compute_once(key, func, coder, return_type, *args, **kwargs)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del flights[key]
+
+    return wrapper
+
+
+def coalesced_cache(
+    key_builder: KeyBuilder,
+    namespace: str = "",
+    expire: int | None = None,
+    coder: type[Coder] = JsonCoder,
+):
+    """
+    Caches results of the function like fastapi_cache.decorator.cache.
+
+    Results missing in the cache are computed once for concurrent calls
+    with the same key in the process and among workers.
+
+    Args:
+        key_builder (KeyBuilder): The cache key builder.
+        namespace (str): The namespace of cache keys.
+        expire (int | None): Seconds to keep results in the cache.
+        coder (type[Coder]): The coder of cached values.
+    """
+
+    def remembering_key_builder(*args, **kwargs) -> str:
+        key = key_builder(*args, **kwargs)
+        current_cache_key.set(key)
+        return key
+
+    def decorator(func):
+        return cache(
+            expire=expire,
+            coder=coder,
+            key_builder=remembering_key_builder,
+            namespace=namespace,
+        )(single_flight(func, coder))
+
+    return decorator
+
+
+def init_cache() -> TwoTierBackend:
+    """
+    Initializes the cache of API responses in Redis with in-process caches.
+
+    Returns:
+        TwoTierBackend: The backend of the cache.
+    """
+    redis = aioredis.from_url(
+        settings.redis.redis_url, encoding="utf-8", decode_responses=True
+    )
+    backend = TwoTierBackend(
+        shared=RedisBackend(redis),
+        local=LocalCache(
+            max_size=settings.cache.local_max_size,
+            max_age=settings.cache.local_max_age,
+        ),
+        redis=redis,
+    )
+    FastAPICache.init(backend, prefix="fastapi-cache")
+    return backend
+
+
+async def invalidate_cached_dates(dates: Iterable[date]) -> None:
+    """
+    Removes cached responses which may include trading results of the given dates.
+
+    Responses for periods ending before the earliest date are kept. When the dates
+    go further back than settings.cache.invalidation_max_days, all responses for
+    periods are removed at once.
+
+    Args:
+        dates (Iterable[date]): The dates trading results were saved for.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    today = date.today()
+    days = (today - dates[0]).days
+    if days > settings.cache.invalidation_max_days:
+        namespaces = [DATED_NAMESPACE]
+    else:
+        namespaces = [
+            f"{DATED_NAMESPACE}:{date_bucket(dates[0] + timedelta(days=day))}"
+            for day in range(max(days, 0) + 1)
+        ]
+    try:
+        for namespace in [LATEST_NAMESPACE, *namespaces]:
+            await FastAPICache.clear(namespace=namespace)
+    except Exception as e:
+        log.error(f"Error invalidating cache: {e}.")
+        return
+    log.info(f"Invalidated cached responses for {dates[0]:%Y%m%d}-{dates[-1]:%Y%m%d}.")
+
+
+async def invalidate_snapshots(*to_invalidate: Snapshot) -> None:
+    """
+    Invalidates the snapshots in the process and in other workers.
+
+    Snapshots are invalidated in the process even if the message to other
+    workers is not published.
+
+    Args:
+        to_invalidate (Snapshot): The snapshots to invalidate.
+    """
+    for snapshot in to_invalidate:
+        snapshot.invalidate()
+    try:
+        backend = FastAPICache.get_backend()
+        if isinstance(backend, TwoTierBackend):
+            for snapshot in to_invalidate:
+                await backend.publish({"snapshot": snapshot.name})
+    except Exception as e:
+        log.error(f"Error publishing invalidation of snapshots: {e}.")
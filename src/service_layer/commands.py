@@ -0,0 +1,262 @@
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import (
+    ORMDailyTradingTotal,
+    ORMDeliveryBasis,
+    ORMDeliveryType,
+    ORMLastTradingResult,
+    ORMOil,
+    ORMProduct,
+    ORMTradingDay,
+    ORMTradingResult,
+)
+from src.service_layer.parser.results_generator import TRADING_RESULT_FIELDS
+
+STAGING_TABLE = "spimex_trading_results_staging"
+
+# Fields of trading results stored in dictionary tables instead of the results table.
+DICTIONARY_FIELDS = {
+    "exchange_product_name": ORMProduct,
+    "delivery_basis_name": ORMDeliveryBasis,
+}
+RESULT_FIELDS = tuple(
+    field for field in TRADING_RESULT_FIELDS if field not in DICTIONARY_FIELDS
+)
+# Dictionary tables with their key and name columns.
+DICTIONARIES = (
+    (ORMProduct, "exchange_product_id", "exchange_product_name"),
+    (ORMOil, "oil_id", None),
+    (ORMDeliveryBasis, "delivery_basis_id", "delivery_basis_name"),
+    (ORMDeliveryType, "delivery_type_id", None),
+)
+
+
+async def upsert_dictionaries(db: AsyncSession) -> None:
+    """
+    Saves products, oils, delivery bases and types of staged trading results.
+
+    Names are taken from the latest staged trading result of each key and
+    replace saved names only if they are not older, so batches of earlier
+    dates loaded later do not bring back outdated names.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+    """
+    for model, key, name in DICTIONARIES:
+        table = model.__tablename__
+        if name is None:
+            await db.execute(
+                text(
+                    f"INSERT INTO {table} ({key}) "
+                    f"SELECT DISTINCT {key} FROM {STAGING_TABLE} "
+                    f"ON CONFLICT ({key}) DO NOTHING"
+                )
+            )
+            continue
+        await db.execute(
+            text(
+                f"INSERT INTO {table} ({key}, {name}, name_date) "
+                f"SELECT DISTINCT ON ({key}) {key}, {name}, date "
+                f"FROM {STAGING_TABLE} ORDER BY {key}, date DESC "
+                f"ON CONFLICT ({key}) DO UPDATE "
+                f"SET {name} = EXCLUDED.{name}, name_date = EXCLUDED.name_date "
+                f"WHERE EXCLUDED.name_date >= {table}.name_date "
+                f"AND ({table}.{name} <> EXCLUDED.{name} "
+                f"OR {table}.name_date <> EXCLUDED.name_date)"
+            )
+        )
+
+
+async def upsert_trading_results(db: AsyncSession, records: list[dict]) -> int:
+    """
+    Saves a batch of trading results with COPY into a staging table and upsert.
+
+    Records are copied into a temporary staging table. Their products, oils,
+    delivery bases and types are saved to the dictionary tables, and the rest
+    of fields are inserted into the trading results table, updating rows already
+    saved for the same exchange product and date. Runs in the transaction of
+    the session, committing is up to the caller.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        records (list[dict]): Trading results as dictionaries of column values.
+
+    Returns:
+        int: Number of inserted or updated trading results.
+    """
+    table = ORMTradingResult.__tablename__
+    staged_columns = ", ".join(
+        f"{DICTIONARY_FIELDS.get(field, ORMTradingResult).__tablename__}.{field}"
+        for field in TRADING_RESULT_FIELDS
+    )
+    columns = ", ".join(RESULT_FIELDS)
+    updates = ", ".join(
+        f"{field} = EXCLUDED.{field}"
+        for field in RESULT_FIELDS
+        if field not in ("exchange_product_id", "date")
+    )
+    await db.execute(
+        text(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} "
+            f"ON COMMIT DELETE ROWS "
+            f"AS SELECT {staged_columns} "
+            f"FROM {table}, {ORMProduct.__tablename__}, "
+            f"{ORMDeliveryBasis.__tablename__} WITH NO DATA"
+        )
+    )
+    await db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=[
+            tuple(record[field] for field in TRADING_RESULT_FIELDS)
+            for record in records
+        ],
+        columns=TRADING_RESULT_FIELDS,
+    )
+    await upsert_dictionaries(db)
+    result = await db.execute(
+        text(
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT DISTINCT ON (exchange_product_id, date) {columns} "
+            f"FROM {STAGING_TABLE} ORDER BY exchange_product_id, date "
+            f"ON CONFLICT (exchange_product_id, date) DO UPDATE "
+            f"SET {updates}, updated_on = timezone('utc', now())"
+        )
+    )
+    return result.rowcount
+
+
+async def update_trading_days(db: AsyncSession, dates: Iterable[date]) -> None:
+    """
+    Records the given dates in the trading calendar with their results counts.
+
+    Runs in the transaction of the session, committing is up to the caller.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        dates (Iterable[date]): The dates trading results were saved for.
+    """
+    table = ORMTradingResult.__tablename__
+    await db.execute(
+        text(
+            f"INSERT INTO {ORMTradingDay.__tablename__} (date, results_count) "
+            f"SELECT date, count(*) FROM {table} "
+            f"WHERE date = ANY(:dates) GROUP BY date "
+            f"ON CONFLICT (date) DO UPDATE "
+            f"SET results_count = EXCLUDED.results_count, "
+            f"loaded_on = timezone('utc', now())"
+        ),
+        {"dates": sorted(set(dates))},
+    )
+
+
+async def update_daily_trading_totals(db: AsyncSession, dates: Iterable[date]) -> None:
+    """
+    Recalculates daily totals of trading results for the given dates.
+
+    Runs in the transaction of the session, committing is up to the caller.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        dates (Iterable[date]): The dates trading results were saved for.
+    """
+    table = ORMTradingResult.__tablename__
+    totals_table = ORMDailyTradingTotal.__tablename__
+    dimensions = "date, oil_id, delivery_basis_id, delivery_type_id"
+    dates = {"dates": sorted(set(dates))}
+    await db.execute(
+        text(f"DELETE FROM {totals_table} WHERE date = ANY(:dates)"), dates
+    )
+    await db.execute(
+        text(
+            f"INSERT INTO {totals_table} ({dimensions}, volume, total, count) "
+            f"SELECT {dimensions}, sum(volume), sum(total), sum(count) "
+            f"FROM {table} WHERE date = ANY(:dates) GROUP BY {dimensions}"
+        ),
+        dates,
+    )
+
+
+async def refresh_last_trading_results(db: AsyncSession) -> int:
+    """
+    Replaces the snapshot of the latest trading day with saved trading results.
+
+    The snapshot keeps names of products and delivery bases next to the results.
+
+    Runs in the transaction of the session, so readers see either the previous
+    or the new snapshot. Committing is up to the caller.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+
+    Returns:
+        int: Number of trading results in the snapshot.
+    """
+    table = ORMTradingResult.__tablename__
+    columns = ", ".join(TRADING_RESULT_FIELDS)
+    await db.execute(text(f"DELETE FROM {ORMLastTradingResult.__tablename__}"))
+    result = await db.execute(
+        text(
+            f"INSERT INTO {ORMLastTradingResult.__tablename__} ({columns}) "
+            f"SELECT {columns} FROM {table} "
+            f"JOIN {ORMProduct.__tablename__} USING (exchange_product_id) "
+            f"JOIN {ORMDeliveryBasis.__tablename__} USING (delivery_basis_id) "
+            f"WHERE date = (SELECT max(date) FROM {table})"
+        )
+    )
+    return result.rowcount
+
+
+async def create_trading_results_partitions(
+    db: AsyncSession, years: Iterable[int]
+) -> list[str]:
+    """
+    Creates missing yearly partitions of the trading results table.
+
+    Rows of the year already saved to the default partition are moved to
+    the new partition before it is attached. Runs in the transaction of
+    the session, committing is up to the caller.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        years (Iterable[int]): The years to create partitions for.
+
+    Returns:
+        list[str]: Names of created partitions.
+    """
+    table = ORMTradingResult.__tablename__
+    created = []
+    for year in years:
+        partition = f"{table}_y{year}"
+        if await db.scalar(text(f"SELECT to_regclass('{partition}')")):
+            continue
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+        await db.execute(
+            text(
+                f"CREATE TABLE {partition} "
+                f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        await db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {table}_default "
+                f"WHERE date >= :start AND date < :end RETURNING *) "
+                f"INSERT INTO {partition} SELECT * FROM moved"
+            ),
+            {"start": start, "end": end},
+        )
+        await db.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+        )
+        created.append(partition)
+    return created
@@ -0,0 +1,303 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Literal, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+from sqlalchemy import Row
+
+from src.models.schemas import TRADING_RESULT_SCHEMA_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+ExportFormat = Literal["ndjson", "csv", "arrow", "parquet"]
+
+EXPORT_FIELDS = TRADING_RESULT_SCHEMA_FIELDS
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNAR_FORMATS = ("arrow", "parquet")
+INTEGER_FIELDS = ("volume", "total", "count")
+
+
+def negotiate_columnar_format(accept: str) -> ExportFormat | None:
+    """
+    Finds a columnar format requested by the Accept header.
+
+    Args:
+        accept (str): The value of the Accept header.
+
+    Returns:
+        ExportFormat | None: The columnar format or None if JSON should be returned.
+    """
+    media_types = {media_type.split(";")[0].strip() for media_type in accept.split(",")}
+    for export_format in COLUMNAR_FORMATS:
+        if MEDIA_TYPES[export_format] in media_types:
+            return export_format
+    return None
+
+
+def check_export_format(export_format: ExportFormat) -> None:
+    """
+    Checks that the format can be encoded in this installation.
+
+    Args:
+        export_format (ExportFormat): The format to encode trading results in.
+    """
+    if export_format in COLUMNAR_FORMATS and pa is None:
+        raise HTTPException(
+            status_code=406, detail=f"Format {export_format} requires pyarrow"
+        )
+
+
+def format_row(row: Row) -> tuple:
+    """
+    Formats values of a trading result row the way the API returns them.
+
+    Args:
+        row (Row): The row with values of EXPORT_FIELDS.
+
+    Returns:
+        tuple: The values with the date in the format "YYYYMMDD".
+    """
+    return tuple(
+        value.strftime("%Y%m%d") if field == "date" else value
+        for field, value in zip(EXPORT_FIELDS, row)
+    )
+
+
+def rows_to_dicts(rows: Sequence[Row]) -> list[dict]:
+    """
+    Converts rows to dictionaries the API returns.
+
+    Rows share few dates, so each date is formatted once.
+
+    Args:
+        rows (Sequence[Row]): The rows of selected columns.
+
+    Returns:
+        list[dict]: Values by column names with the date in the format "YYYYMMDD".
+    """
+    dates = {}
+    results = []
+    for row in rows:
+        result = dict(zip(row._fields, row))
+        if trading_date := result.get("date"):
+            if trading_date not in dates:
+                dates[trading_date] = trading_date.strftime("%Y%m%d")
+            result["date"] = dates[trading_date]
+        results.append(result)
+    return results
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered by the pydantic-core serializer.
+
+    The content is serialized as is, without validation by the response model.
+    """
+
+    def render(self, content) -> bytes:
+        return to_json(content)
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    """
+    Encodes trading result rows as JSON objects separated by new lines.
+
+    Args:
+        rows (Sequence[Row]): The rows with values of EXPORT_FIELDS.
+
+    Returns:
+        bytes: The encoded rows.
+    """
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, format_row(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Sequence[Row], header: bool = False) -> bytes:
+    """
+    Encodes trading result rows as CSV lines.
+
+    Args:
+        rows (Sequence[Row]): The rows with values of EXPORT_FIELDS.
+        header (bool): Whether to start with the line of field names.
+
+    Returns:
+        bytes: The encoded rows.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(format_row(row) for row in rows)
+    return buffer.getvalue().encode()
+
+
+def arrow_schema() -> "pa.Schema":
+    """
+    Builds the Arrow schema of exported trading results.
+
+    Returns:
+        pa.Schema: Schema with integer amounts and the date of trading as date32.
+    """
+    return pa.schema(
+        [
+            (
+                field,
+                (
+                    pa.int64()
+                    if field in INTEGER_FIELDS
+                    else pa.date32() if field == "date" else pa.string()
+                ),
+            )
+            for field in EXPORT_FIELDS
+        ]
+    )
+
+
+def rows_to_record_batch(rows: Sequence[Row], schema: "pa.Schema") -> "pa.RecordBatch":
+    """
+    Builds an Arrow record batch from trading result rows column by column.
+
+    Args:
+        rows (Sequence[Row]): The rows with values of EXPORT_FIELDS.
+        schema (pa.Schema): The schema of the batch.
+
+    Returns:
+        pa.RecordBatch: The batch of trading results.
+    """
+    columns = list(zip(*rows))
+    return pa.record_batch(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+class ChunkSink(io.RawIOBase):
+    """
+    Write-only file collecting bytes written by Arrow writers between drains.
+
+    Keeps track of the total written size, so writers see a regular file position.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        """
+        Takes bytes written since the previous drain.
+
+        Returns:
+            bytes: The written bytes.
+        """
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def encode_columnar(
+    partitions: AsyncIterator[Sequence[Row]], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Encodes partitions of trading result rows as an Arrow IPC stream or a Parquet file.
+
+    Each partition becomes a record batch, or a row group of the Parquet file.
+
+    Args:
+        partitions (AsyncIterator[Sequence[Row]]): Partitions of rows with values of EXPORT_FIELDS.
+        export_format (ExportFormat): Either "arrow" or "parquet".
+
+    Yields:
+        bytes: Chunks of the encoded output.
+    """
+    schema = arrow_schema()
+    sink = ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    async for rows in partitions:
+        if rows:
+            writer.write_batch(rows_to_record_batch(rows, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence[Row]], export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """
+    Encodes partitions of trading result rows as NDJSON or CSV lines.
+
+    Args:
+        partitions (AsyncIterator[Sequence[Row]]): Partitions of rows with values of EXPORT_FIELDS.
+        export_format (ExportFormat): Either "ndjson" or "csv".
+
+    Yields:
+        bytes: Chunks of the encoded output.
+    """
+    header = export_format == "csv"
+    async for rows in partitions:
+        if export_format == "csv":
+            yield encode_csv(rows, header=header)
+            header = False
+        else:
+            yield encode_ndjson(rows)
+    if header:
+        yield encode_csv([], header=True)
+
+
+async def export_trading_results(
+    partitions: AsyncIterator[Sequence[Row]],
+    export_format: ExportFormat = "ndjson",
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes partitions of trading result rows as they arrive.
+
+    Only one partition is kept in memory at a time, optionally gzipped on the fly.
+
+    Args:
+        partitions (AsyncIterator[Sequence[Row]]): Partitions of rows with values of EXPORT_FIELDS.
+        export_format (ExportFormat): The format to encode rows in.
+        compress (bool): Whether to compress the output with gzip.
+
+    Yields:
+        bytes: Chunks of the encoded output.
+    """
+    encode = encode_columnar if export_format in COLUMNAR_FORMATS else encode_rows
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    async for chunk in encode(partitions, export_format):
+        if compressor:
+            chunk = compressor.compress(chunk)
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
@@ -1,126 +1,455 @@
 import logging
+import multiprocessing
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
 from io import BytesIO
 from time import time
+from typing import Awaitable, Callable, Mapping
 
 import asyncio
-from typing import Any
 
-import numpy
 import pandas as pd
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
 
-from src.config import HOST
+from src.config import HOST, settings
 from src.models import dbh
-from src.service_layer.parser.results_generator import generate_trading_result_objects
+from src.service_layer.cache import invalidate_cached_dates, invalidate_snapshots
+from src.service_layer.commands import (
+    refresh_last_trading_results,
+    update_daily_trading_totals,
+    update_trading_days,
+    upsert_trading_results,
+)
+from src.service_layer.parser.file_cache import BulletinCache, bulletin_cache
+from src.service_layer.parser.results_generator import (
+    COUNT_COLUMN,
+    columns_to_records,
+    generate_trading_result_columns,
+)
+from src.service_layer.snapshots import dictionaries_snapshot, last_results_snapshot
 
 log = logging.getLogger(__name__)
 
+UNIT_MARKER = "Единица измерения: Метрическая тонна"
+USED_COLUMNS = [1, 2, 3, 4, 5, 14]
 
-async def get_bytes(url: str, session: ClientSession) -> bytes | None:
+
+def create_client_session() -> ClientSession:
+    """
+    Creates aiohttp ClientSession with a bounded pool of keep-alive connections.
+
+    Returns:
+        ClientSession: The session shared by all requests of a parser run.
+    """
+    connector = TCPConnector(
+        limit=settings.parser.download_concurrency,
+        limit_per_host=settings.parser.download_concurrency,
+        keepalive_timeout=settings.parser.keepalive_timeout,
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=settings.parser.download_timeout),
+    )
+
+
+async def get_response(
+    url: str,
+    session: ClientSession,
+    headers: dict[str, str] | None = None,
+    retries: int | None = None,
+    backoff: float | None = None,
+) -> tuple[bytes | None, Mapping[str, str]]:
+    """
+    Sends a GET async request to the given URL and returns the response bytes and headers.
+
+    Failed requests are retried with exponential backoff and random jitter.
+
+    Args:
+        url (str): The URL to send the GET request to.
+        session (ClientSession): The aiohttp ClientSession to use for the request.
+        headers (dict[str, str] | None): Additional request headers.
+        retries (int | None): The number of retries after a failed request.
+        backoff (float | None): The base delay between retries in seconds.
+
+    Returns:
+        bytes | None: The response bytes or None if the resource was not modified.
+        Mapping[str, str]: The response headers.
+    """
+    retries = settings.parser.download_retries if retries is None else retries
+    backoff = settings.parser.download_backoff if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return None, response.headers
+                response.raise_for_status()
+                data = await response.read()
+                return data, response.headers
+        except (ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                log.error(f"Error: Failed to fetch data from {url}: {e}")
+                raise e
+            delay = backoff * 2**attempt * random.uniform(0.5, 1.5)
+            log.warning(f"Failed to fetch data from {url}: {e}. Retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def get_bytes(
+    url: str,
+    session: ClientSession,
+    retries: int | None = None,
+    backoff: float | None = None,
+) -> bytes | None:
     """
     Sends a GET async request to the given URL and returns the response bytes.
 
     Args:
         url (str): The URL to send the GET request to.
         session (ClientSession): The aiohttp ClientSession to use for the request.
+        retries (int | None): The number of retries after a failed request.
+        backoff (float | None): The base delay between retries in seconds.
 
     Returns:
         bytes: The response bytes from the GET request or None if an error occurred.
     """
+    data, _ = await get_response(url, session, retries=retries, backoff=backoff)
+    return data
+
+
+async def fetch_bulletin(
+    link: str, session: ClientSession, cache: BulletinCache | None = None
+) -> bytes:
+    """
+    Gets the XLS file by the link from the local cache or the website.
+
+    Cached files are returned without a request unless revalidation is enabled,
+    then a conditional GET is sent and the cached file is used if not modified.
+    A downloaded file is returned even if it can not be cached.
+
+    Args:
+        link (str): The link to the XLS file.
+        session (ClientSession): The aiohttp ClientSession to use for the request.
+        cache (BulletinCache | None): The cache of files, the default one if None.
+
+    Returns:
+        bytes: The XLS file data.
+    """
+    cache = cache or bulletin_cache
+    cached = await asyncio.to_thread(cache.get, link)
+    if cached is not None and not settings.parser.cache_revalidate:
+        return cached.data
+    headers = cached.conditional_headers() if cached is not None else None
+    data, response_headers = await get_response(HOST + link, session, headers)
+    if data is None:
+        return cached.data
     try:
-        async with session.get(url) as response:
-            data = await response.read()
-            return data
-    except Exception as e:
-        log.error(f"Error: Failed to fetch data from {url}: {e}")
-        raise e
+        await asyncio.to_thread(
+            cache.put,
+            link,
+            data,
+            response_headers.get("ETag"),
+            response_headers.get("Last-Modified"),
+        )
+    except OSError as e:
+        log.warning(f"Error caching {link}: {e}")
+    return data
 
 
 def extract_data_from_file(data: bytes) -> pd.DataFrame | None:
     """
     Reads data from an XLS file and filter it based on certain conditions.
 
+    The workbook is parsed once: only the used columns are read, the header row
+    is located right after the unit of measurement marker in the same frame.
+
     Args:
         data (bytes): The XLS file data to read.
 
     Returns:
         pd.DataFrame: The filtered DataFrame or None if an error occurred.
     """
-    file = pd.read_excel(BytesIO(data), index_col=False)
-    rows, cols = numpy.where(file == "Единица измерения: Метрическая тонна")
-    row = rows[0] + 2
+    sheet = pd.read_excel(BytesIO(data), header=None, usecols=USED_COLUMNS)
+    marker_rows = sheet.index[(sheet == UNIT_MARKER).any(axis=1)]
+    header_row = marker_rows[0] + 1
 
-    filtered = pd.read_excel(
-        io=data,
-        skiprows=row,
-        usecols=[1, 2, 3, 4, 5, 14],
-    )
-    return filtered[filtered["Количество\nДоговоров,\nшт."] != "-"]
+    filtered = sheet.iloc[header_row + 1 :].reset_index(drop=True)
+    filtered.columns = sheet.iloc[header_row].tolist()
+    filtered = filtered[filtered[COUNT_COLUMN] != "-"]
+    for column in filtered.columns:
+        try:
+            filtered[column] = pd.to_numeric(filtered[column])
+        except (ValueError, TypeError):
+            continue
+    return filtered
 
 
-async def get_data_by_link(filepath: str, link: str) -> tuple[Any, str] | None:
+def parse_bulletin(data: bytes, link: str) -> dict[str, list]:
     """
-    Sends a GET request to the given URL, extracts data from the XLS file.
+    Extracts trading results from the XLS file.
+
+    Takes raw bytes and returns compact columns, so it can be run in a separate
+    process without pickling DataFrames or lots of small objects.
 
     Args:
-        filepath (str): The full path to file.
-        link (str): The link to send the GET request to.
+        data (bytes): The XLS file data to read.
+        link (str): The link from which the data was fetched.
 
     Returns:
-        pd.DataFrame: The filtered DataFrame or None if an error occurred.
-        str: The link from which the data was fetched.
+        dict[str, list]: Lists of values of trading results by field names.
     """
-    t0 = time()
-    async with ClientSession() as session:
-        log.info(f"Started reading {filepath}")
-        data = await get_bytes(filepath, session)
+    return generate_trading_result_columns(extract_data_from_file(data), link)
+
+
+def create_parse_executor() -> Executor:
+    """
+    Creates executor for parsing XLS files according to the parser settings.
+
+    Parsing is GIL-bound, so the process pool lets it use several CPU cores.
+
+    Returns:
+        Executor: Thread or process pool with parse_workers workers.
+    """
+    if settings.parser.parse_executor == "process":
+        return ProcessPoolExecutor(
+            max_workers=settings.parser.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return ThreadPoolExecutor(max_workers=settings.parser.parse_workers)
+
+
+async def download_bulletins(
+    links: set[str], session: ClientSession, queue: asyncio.Queue
+) -> set[str]:
+    """
+    Downloads XLS files by the given links and puts them into the queue.
+
+    The number of simultaneous downloads is bounded by the parser settings.
+
+    Args:
+        links (set[str]): The links to XLS files.
+        session (ClientSession): The aiohttp ClientSession to use for the requests.
+        queue (asyncio.Queue): The queue of downloaded files and their links.
+
+    Returns:
+        set[str]: The links of files that failed to download.
+    """
+    semaphore = asyncio.Semaphore(settings.parser.download_concurrency)
+    failed = set()
+
+    async def download(link: str) -> None:
+        async with semaphore:
+            log.info(f"Started reading {link}")
+            try:
+                data = await fetch_bulletin(link, session)
+            except Exception as e:
+                log.error(f"Error downloading {link}: {e!r}")
+                failed.add(link)
+                return
+        await queue.put((data, link))
+
+    await asyncio.gather(*(download(link) for link in links))
+    return failed
+
+
+async def parse_bulletins(
+    queue: asyncio.Queue, results_queue: asyncio.Queue, executor: Executor
+) -> set[str]:
+    """
+    Parses downloaded XLS files from the queue until it gets None.
+
+    Files that fail to parse are removed from the cache to be downloaded again.
+
+    Args:
+        queue (asyncio.Queue): The queue of downloaded files and their links.
+        results_queue (asyncio.Queue): The queue to put trading results records of each file to.
+        executor (Executor): The thread or process pool to parse files in.
+
+    Returns:
+        set[str]: The links of files that failed to parse.
+    """
+    loop = asyncio.get_running_loop()
+    failed = set()
+    while (item := await queue.get()) is not None:
+        data, link = item
+        t0 = time()
         try:
-            df = await asyncio.to_thread(extract_data_from_file, data=data)
+            columns = await loop.run_in_executor(executor, parse_bulletin, data, link)
+            records = columns_to_records(columns)
         except Exception as e:
-            log.error(f"Error extracting data from {filepath}: {e}")
+            log.error(f"Error extracting data from {link}: {e}")
+            await asyncio.to_thread(bulletin_cache.remove, link)
+            failed.add(link)
         else:
             log.info(f"Finished reading. Execution time {time() - t0:.3f} seconds.")
-            return df, link
+            await results_queue.put(records)
+    return failed
+
+
+async def save_trading_results(results_queue: asyncio.Queue) -> set[date]:
+    """
+    Saves trading results records from the queue until it gets None.
+
+    Records of files that are ready at the same time are saved together
+    in batches of up to batch_size records.
+
+    Args:
+        results_queue (asyncio.Queue): The queue of trading results records of each file.
+
+    Returns:
+        set[date]: The dates of saved trading results.
+    """
+    dates = set()
+    buffer = []
+    while (records := await results_queue.get()) is not None:
+        buffer.extend(records)
+        if results_queue.empty() or len(buffer) >= settings.parser.batch_size:
+            dates |= await write_to_db(buffer)
+            buffer = []
+    if buffer:
+        dates |= await write_to_db(buffer)
+    return dates
 
 
-async def write_to_db(results_list: list) -> None:
+async def write_to_db(records: list[dict], batch_size: int | None = None) -> set[date]:
     """
-    Save the given trading results to the database.
+    Save the given trading results to the database in batches.
+
+    Each batch is copied and upserted in its own transaction together with
+    the trading calendar and daily totals updates, so a failed batch does not
+    roll back the others and re-runs do not fail on duplicates.
 
     Args:
-        results_list (list): The list of TradingResult objects to save to the database.
+        records (list[dict]): The list of trading results records to save to the database.
+        batch_size (int | None): The number of records saved in one transaction.
+
+    Returns:
+        set[date]: The dates of trading results in committed batches.
     """
     t0 = time()
+    saved_dates = set()
+    batch_size = batch_size or settings.parser.batch_size
     log.info(f"Start writing results to db.")
     async with dbh.session_factory() as session:
-        session.add_all(results_list)
+        for start in range(0, len(records), batch_size):
+            batch = records[start : start + batch_size]
+            try:
+                await upsert_trading_results(session, batch)
+                dates = {record["date"] for record in batch}
+                await update_trading_days(session, dates)
+                await update_daily_trading_totals(session, dates)
+                await session.commit()
+            except Exception as e:
+                log.error(f"Error saving trading results: {e} to db.")
+                await session.rollback()
+            else:
+                saved_dates |= dates
+    log.info(
+        f"Finished writing results to db. Execution time {time() - t0:.3f} seconds."
+    )
+    return saved_dates
+
+
+async def refresh_derived_data(dates: set[date]) -> None:
+    """
+    Refreshes data derived from saved trading results after ingestion.
+
+    Replaces the snapshot of the latest trading day, drops in-process copies
+    of the snapshot and the dictionaries in all workers and invalidates cached
+    responses which may include trading results of the saved dates.
+
+    Args:
+        dates (set[date]): The dates of saved trading results.
+    """
+    if not dates:
+        return
+    try:
+        async with dbh.session_factory() as session:
+            try:
+                count = await refresh_last_trading_results(session)
+                await session.commit()
+            except Exception as e:
+                log.error(f"Error refreshing latest trading results: {e}.")
+                await session.rollback()
+            else:
+                log.info(
+                    f"Refreshed latest trading results snapshot with {count} results."
+                )
+    finally:
+        # Saved dates are committed, so cached data is dropped even if
+        # the snapshot is not refreshed.
+        await invalidate_snapshots(last_results_snapshot, dictionaries_snapshot)
+        await invalidate_cached_dates(dates)
+
+
+async def process_bulletins(
+    produce: Callable[[asyncio.Queue], Awaitable[set[str] | None]],
+) -> set[str]:
+    """
+    Parses XLS files put into a queue by the producer and saves trading results.
+
+    Files are processed as a pipeline: the producer feeds a bounded queue consumed
+    by parsing workers, and trading results of parsed files are saved as soon
+    as they are ready through another bounded queue, so memory does not grow
+    with the number of files and saved files survive a failed run. Derived data
+    and cached responses for the saved dates are refreshed once all files are saved,
+    even if the producer fails.
+
+    Args:
+        produce (Callable): The coroutine function putting files and their links
+            into the queue, it may return the links of files it failed to produce.
+
+    Returns:
+        set[str]: The links of files that failed to download or parse.
+    """
+    queue = asyncio.Queue(maxsize=settings.parser.parse_workers * 2)
+    results_queue = asyncio.Queue(maxsize=settings.parser.parse_workers * 2)
+    writer = asyncio.create_task(save_trading_results(results_queue))
+    executor = create_parse_executor()
+    workers = [
+        asyncio.create_task(parse_bulletins(queue, results_queue, executor))
+        for _ in range(settings.parser.parse_workers)
+    ]
+    failed = set()
+    try:
+        failed |= await produce(queue) or set()
+    finally:
+        # Files produced before a failure are still parsed and saved,
+        # and derived data is refreshed for the committed dates.
         try:
-            log.info(
-                f"Finished writing results to db. Execution time {time() - t0:.3f} seconds."
-            )
-            await session.commit()
-        except Exception as e:
-            log.error(f"Error saving trading results: {e} to db.")
-            await session.rollback()
+            for _ in workers:
+                await queue.put(None)
+            for worker_failed in await asyncio.gather(*workers):
+                failed |= worker_failed
+        finally:
+            # Waiting for the pool to shut down would block the event loop.
+            await asyncio.to_thread(executor.shutdown)
+            await results_queue.put(None)
+            await refresh_derived_data(await writer)
+    return failed
 
 
-async def parse_trading_results(links: set) -> None:
+async def parse_trading_results(links: set, session: ClientSession) -> set[str]:
     """
     Parses trading results from the given links and saves them to the database.
 
     Args:
         links (set): The set of URLs to fetch trading results from.
+        session (ClientSession): The aiohttp ClientSession to use for the requests.
+
+    Returns:
+        set[str]: The links of files that failed to download or parse.
     """
     t0 = time()
-    tasks = []
-    for link in links:
-        task = asyncio.create_task(get_data_by_link(HOST + link, link))
-        tasks.append(task)
-    df_list = await asyncio.gather(*tasks)
-    results_list = []
-    for df in df_list:
-        results_list.extend(list(generate_trading_result_objects(df[0], df[1])))
-    await write_to_db(results_list)
+    failed = await process_bulletins(
+        lambda queue: download_bulletins(links, session, queue)
+    )
+    if failed:
+        log.error(
+            f"Failed to load {len(failed)} of {len(links)} files: "
+            f"{', '.join(sorted(failed))}."
+        )
     log.warning(
         f"Parsed and saved trading results. Execution time {time() - t0:.3f} seconds."
     )
+    return failed
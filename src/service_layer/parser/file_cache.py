@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from src.config import settings
+
+log = logging.getLogger(__name__)
+
+
+class CachedBulletin:
+    """
+    Bulletin file stored in the cache.
+
+    Attributes:
+        data (bytes): The XLS file data.
+        etag (str | None): The ETag header of the response the file was fetched with.
+        last_modified (str | None): The Last-Modified header of the response.
+    """
+
+    def __init__(self, data: bytes, etag: str | None, last_modified: str | None):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> dict[str, str]:
+        """
+        Builds headers for a conditional GET request of the cached file.
+
+        Returns:
+            dict[str, str]: If-None-Match and If-Modified-Since headers.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class BulletinCache:
+    """
+    On-disk cache of downloaded bulletins.
+
+    Files are stored under the SHA-256 hash of their link together with
+    the response validators. When the total size exceeds the limit,
+    the least recently used files are evicted.
+
+    Files are written atomically, the data before the validators, so a file
+    is never read together with the validators of another response.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int):
+        """
+        Initializes the cache in the given directory.
+
+        Args:
+            directory (str | Path): The directory to store files in.
+            max_size (int): The maximum total size of stored files in bytes.
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _paths(self, link: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(link.encode()).hexdigest()
+        return self.directory / f"{key}.xls", self.directory / f"{key}.json"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _add_size(self, delta: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(
+                    path.stat().st_size for path in self.directory.glob("*.xls")
+                )
+            else:
+                self._size += delta
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def get(self, link: str) -> CachedBulletin | None:
+        """
+        Reads the file fetched by the link from the cache.
+
+        Args:
+            link (str): The link the file was fetched by.
+
+        Returns:
+            CachedBulletin | None: The cached file or None if it is not cached.
+        """
+        data_path, meta_path = self._paths(link)
+        try:
+            data = data_path.read_bytes()
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(data_path)
+        except OSError as e:
+            log.warning(f"Error touching {data_path.name} in bulletins cache: {e}")
+        return CachedBulletin(data, meta.get("etag"), meta.get("last_modified"))
+
+    def put(
+        self,
+        link: str,
+        data: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """
+        Stores the file fetched by the link and evicts old files if needed.
+
+        Args:
+            link (str): The link the file was fetched by.
+            data (bytes): The XLS file data.
+            etag (str | None): The ETag header of the response.
+            last_modified (str | None): The Last-Modified header of the response.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(link)
+        old_size = self._file_size(data_path)
+        self._write(data_path, data)
+        meta = {"link": link, "etag": etag, "last_modified": last_modified}
+        self._write(meta_path, json.dumps(meta).encode())
+        self._add_size(len(data) - old_size)
+        self.evict()
+
+    def remove(self, link: str) -> None:
+        """
+        Removes the file fetched by the link from the cache, e.g. if it is corrupted.
+
+        Args:
+            link (str): The link the file was fetched by.
+        """
+        data_path, meta_path = self._paths(link)
+        size = self._file_size(data_path)
+        meta_path.unlink(missing_ok=True)
+        data_path.unlink(missing_ok=True)
+        self._add_size(-size)
+        log.info(f"Removed {data_path.name} from bulletins cache")
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used files while the cache exceeds its size.
+
+        The directory is only listed when the running total exceeds the limit.
+        """
+        self._add_size(0)
+        with self._lock:
+            if self._size <= self.max_size:
+                return
+            files = []
+            for path in self.directory.glob("*.xls"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+            files.sort()
+            size = sum(file_size for _, file_size, _ in files)
+            for _, file_size, path in files:
+                if size <= self.max_size:
+                    break
+                path.with_suffix(".json").unlink(missing_ok=True)
+                path.unlink(missing_ok=True)
+                size -= file_size
+                log.info(f"Evicted {path.name} from bulletins cache")
+            self._size = size
+
+
+bulletin_cache = BulletinCache(
+    directory=settings.parser.cache_dir,
+    max_size=settings.parser.cache_max_size,
+)
@@ -1,15 +1,28 @@
+import html
 import logging
+import re
 from time import time
+from typing import Collection
 
 import asyncio
 from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
-from src.config import RESULTS_URL
+from src.config import RESULTS_URL, settings
 from src.service_layer.utils import get_date_from_link
 
 log = logging.getLogger(__name__)
 
+ACCORDION_PATTERN = re.compile(
+    r'<div\b[^>]*\bclass="(?:[^"]*\s)?accordeon-inner(?:\s[^"]*)?"'
+)
+ITEM_PATTERN = re.compile(
+    r'\bclass="(?:[^"]*\s)?accordeon-inner__wrap-item(?:\s[^"]*)?"'
+)
+DIV_TAG_PATTERN = re.compile(r"<(/?)div\b", re.IGNORECASE)
+ANCHOR_PATTERN = re.compile(r"<a\b[^>]*>", re.IGNORECASE)
+HREF_PATTERN = re.compile(r"\bhref\s*=\s*[\"']([^\"']*)[\"']", re.IGNORECASE)
+
 
 async def get_html(url: str, session: ClientSession) -> str | None:
     """
@@ -31,8 +44,78 @@ async def get_html(url: str, session: ClientSession) -> str | None:
         raise e
 
 
+def find_block_end(response: str, start: int) -> int:
+    """
+    Finds the end of the div element starting at the given position.
+
+    Args:
+        response (str): The HTML response.
+        start (int): The position of the opening tag of the div element.
+
+    Returns:
+        int: The position of its closing tag or the end of the response if not closed.
+    """
+    depth = 0
+    for tag in DIV_TAG_PATTERN.finditer(response, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return tag.start()
+    return len(response)
+
+
+def find_item_hrefs(response: str) -> list[str | None] | None:
+    """
+    Finds links of accordion items by scanning the accordion block of the HTML.
+
+    Only the accordion block is scanned with regular expressions up to its
+    closing tag, no document tree is built.
+
+    Args:
+        response (str): The HTML response containing the trading results.
+
+    Returns:
+        list[str | None] | None: The links of accordion items in the order on the page
+            or None if the accordion block or its items were not found.
+    """
+    block = ACCORDION_PATTERN.search(response)
+    if block is None:
+        return None
+    end = find_block_end(response, block.start())
+    items = ITEM_PATTERN.split(response[block.end() : end])[1:]
+    if not items:
+        return None
+    hrefs = []
+    for item in items:
+        anchor = ANCHOR_PATTERN.search(item)
+        href = HREF_PATTERN.search(anchor.group()) if anchor else None
+        hrefs.append(html.unescape(href.group(1)) if href else None)
+    return hrefs
+
+
+def find_item_hrefs_with_soup(response: str) -> list[str | None]:
+    """
+    Finds links of accordion items by parsing the whole HTML with BeautifulSoup.
+
+    Args:
+        response (str): The HTML response containing the trading results.
+
+    Returns:
+        list[str | None]: The links of accordion items in the order on the page.
+    """
+    soup = BeautifulSoup(response, "html.parser")
+    block = soup.find("div", class_="accordeon-inner")
+    items = block.select(
+        "div.accordeon-inner__wrap-item",
+    )
+    return [item.find("a").get("href") for item in items]
+
+
 def extract_links_from_response(
-    response: str, earliest_date: str, links: set[str], is_new: bool
+    response: str,
+    earliest_date: str,
+    links: set[str],
+    is_new: bool,
+    loaded_dates: Collection[str] = (),
 ) -> tuple[set[str], bool]:
     """
     Extracts links to XLS files with daily trading results from the given HTML response.
@@ -42,24 +125,23 @@ def extract_links_from_response(
         earliest_date (str): The earliest date to consider in the format "YYYYMMDD".
         links (set[str]): The set of links to add new ones to.
         is_new (bool): A boolean indicating if new links were found.
+        loaded_dates (Collection[str]): Dates in the format "YYYYMMDD" to skip links of.
 
     Returns:
         tuple[set[str], bool]: The updated set of links and a boolean indicating if new links were found.
     """
-    soup = BeautifulSoup(response, "html.parser")
-    block = soup.find("div", class_="accordeon-inner")
-    items = block.select(
-        "div.accordeon-inner__wrap-item",
-    )
-    for item in items:
-        string = item.find("a")
-        link = string.get("href")
+    hrefs = find_item_hrefs(response)
+    if hrefs is None:
+        log.warning("Accordion block not found by scanning, parsing the whole page")
+        hrefs = find_item_hrefs_with_soup(response)
+    for link in hrefs:
         if link:
             date = get_date_from_link(link)
             if not date:
                 log.error("Error getting date from the link")
             elif date > earliest_date:
-                links.add(link)
+                if date not in loaded_dates:
+                    links.add(link)
             else:
                 is_new = False
                 break
@@ -67,30 +149,55 @@ def extract_links_from_response(
 
 
 async def get_new_trading_results_links(
-    session: ClientSession, earliest_date: str = "20221231"
+    session: ClientSession,
+    earliest_date: str = "20221231",
+    loaded_dates: Collection[str] = (),
 ) -> set[str]:
     """
     Get unique links to XLS files with daily trading results from the website.
 
+    Pages are fetched concurrently in windows starting from one page and doubling
+    up to the configured size, pages fetched after the one crossing the earliest
+    date are discarded.
+
     Args:
         session (ClientSession): The aiohttp ClientSession object.
         earliest_date (str, optional): The earliest date to consider in the format "YYYYMMDD".
+        loaded_dates (Collection[str], optional): Dates in the format "YYYYMMDD"
+            which results are already loaded, their links are skipped.
 
     Returns:
         set[str]: The unique links to XLS files with daily trading results.
     """
     t0 = time()
     page_num = 1
+    window = 1
     links = set()
     log.info("Start getting links from the website...")
     is_new = True
     while is_new:
-        url = f"{RESULTS_URL}?page=page-{page_num}"
-        response = await get_html(url=url, session=session)
-        links, is_new = await asyncio.to_thread(
-            extract_links_from_response, response, earliest_date, links, is_new
+        responses = await asyncio.gather(
+            *(
+                get_html(url=f"{RESULTS_URL}?page=page-{num}", session=session)
+                for num in range(page_num, page_num + window)
+            ),
+            return_exceptions=True,
         )
-        page_num += 1
+        for response in responses:
+            if isinstance(response, BaseException):
+                raise response
+            links, is_new = await asyncio.to_thread(
+                extract_links_from_response,
+                response,
+                earliest_date,
+                links,
+                is_new,
+                loaded_dates,
+            )
+            if not is_new:
+                break
+        page_num += window
+        window = min(window * 2, settings.parser.pages_window)
     log.warning(
         f"Got links from the website. Execution time {time() - t0:.3f} seconds."
     )
@@ -1,37 +1,93 @@
+from datetime import datetime
+
 import pandas as pd
 
-from src.models import ORMTradingResult
-from src.models.domain import TradingResult
 from src.service_layer.utils import get_date_from_link
 
+PRODUCT_ID_COLUMN = "Код\nИнструмента"
+PRODUCT_NAME_COLUMN = "Наименование\nИнструмента"
+BASIS_NAME_COLUMN = "Базис\nпоставки"
+VOLUME_COLUMN = "Объем\nДоговоров\nв единицах\nизмерения"
+TOTAL_COLUMN = "Обьем\nДоговоров,\nруб."
+COUNT_COLUMN = "Количество\nДоговоров,\nшт."
+
+TRADING_RESULT_FIELDS = (
+    "exchange_product_id",
+    "exchange_product_name",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_basis_name",
+    "delivery_type_id",
+    "volume",
+    "total",
+    "count",
+    "date",
+)
+
+
+def generate_trading_result_columns(data: pd.DataFrame, link: str) -> dict[str, list]:
+    """
+    Converts DataFrame with trading result data to columns of trading results.
+
+    Rows with empty volume and summary rows containing "Итого" are filtered out
+    with vectorized masks, IDs are derived from the exchange product ID by
+    string slicing of the whole column.
+
+    Args:
+        data (pd.DataFrame): DataFrame containing trading result data.
+        link (str): Link to the source data.
+
+    Returns:
+        dict[str, list]: Lists of values of trading results by field names.
+    """
+    data = data.iloc[1 : len(data) - 2]
+    is_summary = (
+        data.astype(str)
+        .apply(lambda column: column.str.contains("Итого", regex=False))
+        .any(axis=1)
+    )
+    data = data[data[VOLUME_COLUMN].notna() & ~is_summary]
+    product_ids = data[PRODUCT_ID_COLUMN].astype(str)
+    trading_date = datetime.strptime(get_date_from_link(link), "%Y%m%d").date()
+    return {
+        "exchange_product_id": product_ids.tolist(),
+        "exchange_product_name": data[PRODUCT_NAME_COLUMN].astype(str).tolist(),
+        "oil_id": product_ids.str[:4].tolist(),
+        "delivery_basis_id": product_ids.str[4:7].tolist(),
+        "delivery_basis_name": data[BASIS_NAME_COLUMN].astype(str).tolist(),
+        "delivery_type_id": product_ids.str[-1].tolist(),
+        "volume": pd.to_numeric(data[VOLUME_COLUMN]).astype("int64").tolist(),
+        "total": pd.to_numeric(data[TOTAL_COLUMN]).astype("int64").tolist(),
+        "count": pd.to_numeric(data[COUNT_COLUMN]).astype("int64").tolist(),
+        "date": [trading_date] * len(data),
+    }
+
+
+def columns_to_records(columns: dict[str, list]) -> list[dict]:
+    """
+    Converts columns of trading results to records.
+
+    Args:
+        columns (dict[str, list]): Lists of values of trading results by field names.
+
+    Returns:
+        list[dict]: Trading results as dictionaries of column values.
+    """
+    return [
+        dict(zip(TRADING_RESULT_FIELDS, values))
+        for values in zip(*(columns[field] for field in TRADING_RESULT_FIELDS))
+    ]
+
 
-def generate_trading_result_objects(data: pd.DataFrame, link: str):
+def generate_trading_result_records(data: pd.DataFrame, link: str) -> list[dict]:
     """
-    Generates trading results objects from rows of DataFrame.
+    Generates trading results records from DataFrame in one pass.
 
     Args:
         data (pd.DataFrame): DataFrame containing trading result data.
         link (str): Link to the source data.
 
-    Yields:
-        ORMTradingResult: Trading result object in database.
+    Returns:
+        list[dict]: Trading results as dictionaries of column values.
     """
-    for i in range(1, len(data) - 2):
-        row = data.iloc[i]
-        if (
-            pd.isna(row["Объем\nДоговоров\nв единицах\nизмерения"])
-            or row.apply(lambda x: "Итого" in str(x)).any()
-        ):
-            continue
-        else:
-            yield ORMTradingResult(
-                **TradingResult(
-                    exchange_product_id=row["Код\nИнструмента"],
-                    exchange_product_name=row["Наименование\nИнструмента"],
-                    delivery_basis_name=row["Базис\nпоставки"],
-                    volume=int(row["Объем\nДоговоров\nв единицах\nизмерения"]),
-                    total=int(row["Обьем\nДоговоров,\nруб."]),
-                    count=int(row["Количество\nДоговоров,\nшт."]),
-                    date=get_date_from_link(link),
-                ).to_dict()
-            )
+    return columns_to_records(generate_trading_result_columns(data, link))
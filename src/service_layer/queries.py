@@ -1,33 +1,110 @@
 from datetime import date
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import BigInteger, Float, Row, Select, and_, cast, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
-from src.models import ORMTradingResult
+from src.models import (
+    ORMDailyTradingTotal,
+    ORMDeliveryBasis,
+    ORMProduct,
+    ORMTradingDay,
+    ORMTradingResult,
+)
+from src.models.schemas import DIMENSIONS, TRADING_RESULT_SCHEMA_FIELDS, Dimension
+from src.service_layer.commands import DICTIONARY_FIELDS
+from src.service_layer.snapshots import dictionaries_snapshot, last_results_snapshot
 from src.service_layer.utils import validate_dates_interval
 
 
 async def get_dates(
     db: AsyncSession,
-    days: int,
+    days: int | None,
 ) -> list[str]:
     """
-    Gets a list of dates of the last trading days.
+    Gets a list of dates of the last trading days from the trading calendar.
 
     Args:
         db (AsyncSession): Asynchronous session with the database.
-        days (int): Number of last trading days.
+        days (int | None): Number of last trading days, all of them if None.
 
     Returns:
         list[str]: List of dates of the last trading days in the format "YYYYMMDD".
     """
     dates = await db.scalars(
-        select(ORMTradingResult.date)
-        .order_by(ORMTradingResult.date.desc())
-        .distinct()
-        .limit(days)
+        select(ORMTradingDay.date).order_by(ORMTradingDay.date.desc()).limit(days)
     )
-    return list(dates.all())
+    return [trading_date.strftime("%Y%m%d") for trading_date in dates.all()]
+
+
+def trading_result_columns() -> list[InstrumentedAttribute]:
+    """
+    Gets columns of the API fields of trading results.
+
+    Returns:
+        list[InstrumentedAttribute]: Columns of the results and dictionary tables.
+    """
+    return [
+        getattr(DICTIONARY_FIELDS.get(field, ORMTradingResult), field)
+        for field in TRADING_RESULT_SCHEMA_FIELDS
+    ]
+
+
+def select_filtered_trading_results(
+    filters: dict[str, str] | None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    after: tuple[date, str] | None = None,
+    limit: int | None = None,
+) -> Select:
+    """
+    Builds a query of trading results for a given period.
+
+    Only the columns returned by the API are selected, names of products
+    and delivery bases are joined from the dictionaries. Results are ordered
+    by date and exchange product ID descending, so pages are fetched by
+    the position of the last result of the previous page.
+
+    Args:
+        filters (dict[str, str] | None): Optional filters for trading results parameters.
+        start_date (date | None): Beginning of the period for analysis of dynamics.
+        end_date (date | None): End of the period for analysis of dynamics.
+        after (tuple[date, str] | None): Optional date and exchange product ID to start after.
+        limit (int | None): Optional maximum number of trading results.
+
+    Returns:
+        Select: The query of trading results for a given period.
+    """
+    start_date, end_date = validate_dates_interval(start_date, end_date)
+    query = (
+        select(*trading_result_columns())
+        .join(
+            ORMProduct,
+            ORMProduct.exchange_product_id == ORMTradingResult.exchange_product_id,
+        )
+        .join(
+            ORMDeliveryBasis,
+            ORMDeliveryBasis.delivery_basis_id == ORMTradingResult.delivery_basis_id,
+        )
+        .filter(
+            *(getattr(ORMTradingResult, key) == value for key, value in filters.items())
+        )
+        .filter(
+            and_(ORMTradingResult.date >= start_date, ORMTradingResult.date <= end_date)
+        )
+        .order_by(
+            ORMTradingResult.date.desc(), ORMTradingResult.exchange_product_id.desc()
+        )
+    )
+    if after:
+        query = query.filter(
+            tuple_(ORMTradingResult.date, ORMTradingResult.exchange_product_id)
+            < tuple_(*after)
+        )
+    if limit:
+        query = query.limit(limit)
+    return query
 
 
 async def get_filtered_trading_results(
@@ -35,27 +112,136 @@ async def get_filtered_trading_results(
     filters: dict[str, str] | None,
     start_date: date | None = None,
     end_date: date | None = None,
-) -> list[ORMTradingResult]:
+    after: tuple[date, str] | None = None,
+    limit: int | None = None,
+) -> list[Row]:
     """
     Gets a list of trading results for a given period.
 
+    Rows are returned as tuples of the API fields, without loading ORM objects.
+
     Args:
         db (AsyncSession): Asynchronous session with the database.
         filters (dict[str, str] | None): Optional filters for trading results parameters.
         start_date (date | None): Beginning of the period for analysis of dynamics.
         end_date (date | None): End of the period for analysis of dynamics.
+        after (tuple[date, str] | None): Optional date and exchange product ID to start after.
+        limit (int | None): Optional maximum number of trading results.
 
     Returns:
-        list(ORMTradingResult): List of trading results for a given period.
+        list(Row): List of trading results for a given period.
+    """
+    results = await db.execute(
+        select_filtered_trading_results(filters, start_date, end_date, after, limit)
+    )
+    return list(results.all())
+
+
+async def stream_filtered_trading_results(
+    db: AsyncSession,
+    filters: dict[str, str] | None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    partition_size: int = 1000,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Streams trading results for a given period through a server-side cursor.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        filters (dict[str, str] | None): Optional filters for trading results parameters.
+        start_date (date | None): Beginning of the period for analysis of dynamics.
+        end_date (date | None): End of the period for analysis of dynamics.
+        partition_size (int): The number of rows fetched at a time.
+
+    Yields:
+        Sequence[Row]: Partitions of rows with values of the API fields.
+    """
+    query = select_filtered_trading_results(
+        filters, start_date, end_date
+    ).execution_options(yield_per=partition_size)
+    result = await db.stream(query)
+    async for partition in result.partitions():
+        yield partition
+
+
+def select_aggregated_trading_results(
+    group_by: Sequence[Dimension],
+    filters: dict[str, str] | None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> Select:
+    """
+    Builds a query of totals of trading results for a given period.
+
+    Totals are summed up from the daily totals table, grouped by the given
+    dimensions in the order of DIMENSIONS. The average price is the total value
+    divided by the total volume.
+
+    Args:
+        group_by (Sequence[Dimension]): The dimensions to group totals by.
+        filters (dict[str, str] | None): Optional filters for trading results parameters.
+        start_date (date | None): Beginning of the period for analysis of dynamics.
+        end_date (date | None): End of the period for analysis of dynamics.
+
+    Returns:
+        Select: The query of totals for a given period.
     """
     start_date, end_date = validate_dates_interval(start_date, end_date)
-    results = await db.scalars(
-        select(ORMTradingResult)
+    dimensions = [
+        getattr(ORMDailyTradingTotal, dimension)
+        for dimension in DIMENSIONS
+        if dimension in group_by
+    ]
+    volume = cast(func.sum(ORMDailyTradingTotal.volume), BigInteger)
+    total = cast(func.sum(ORMDailyTradingTotal.total), BigInteger)
+    return (
+        select(
+            *dimensions,
+            volume.label("volume"),
+            total.label("total"),
+            cast(func.sum(ORMDailyTradingTotal.count), BigInteger).label("count"),
+            (cast(total, Float) / func.nullif(volume, 0)).label("average_price"),
+        )
         .filter_by(**filters)
         .filter(
-            and_(ORMTradingResult.date >= start_date, ORMTradingResult.date <= end_date)
+            and_(
+                ORMDailyTradingTotal.date >= start_date,
+                ORMDailyTradingTotal.date <= end_date,
+            )
+        )
+        .group_by(*dimensions)
+        .order_by(
+            *(
+                column.desc() if column is ORMDailyTradingTotal.date else column
+                for column in dimensions
+            )
         )
-        .order_by(ORMTradingResult.date.desc())
+    )
+
+
+async def get_aggregated_trading_results(
+    db: AsyncSession,
+    group_by: Sequence[Dimension],
+    filters: dict[str, str] | None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[Row]:
+    """
+    Gets totals of trading results for a given period grouped by the given dimensions.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+        group_by (Sequence[Dimension]): The dimensions to group totals by.
+        filters (dict[str, str] | None): Optional filters for trading results parameters.
+        start_date (date | None): Beginning of the period for analysis of dynamics.
+        end_date (date | None): End of the period for analysis of dynamics.
+
+    Returns:
+        list(Row): Rows of dimensions, volume, total, count and average price.
+    """
+    results = await db.execute(
+        select_aggregated_trading_results(group_by, filters, start_date, end_date)
     )
     return list(results.all())
 
@@ -63,25 +249,36 @@ async def get_filtered_trading_results(
 async def get_last_results(
     db: AsyncSession,
     filters: dict[str, str] | None,
-) -> list[ORMTradingResult]:
+) -> list[Row]:
     """
     Gets a list of trading results for the latest date.
 
+    Results are filtered in the in-process copy of the latest trading day
+    snapshot, which is loaded from the database only when it is stale.
+
     Args:
         db (AsyncSession): Asynchronous session with the database.
         filters (dict[str, str] | None): Optional filters for trading results parameters.
 
     Returns:
-        list(ORMTradingResult): List of trading results for the latest date.
+        list(Row): List of trading results for the latest date.
     """
-    last_date_subquery = (
-        select(func.max(ORMTradingResult.date)).select_from(ORMTradingResult)
-    ).scalar_subquery()
-    query = (
-        select(ORMTradingResult)
-        .filter_by(**filters)
-        .where(ORMTradingResult.date == last_date_subquery)
-    )
+    results = await last_results_snapshot.get(db)
+    return [
+        result
+        for result in results
+        if all(getattr(result, key) == value for key, value in filters.items())
+    ]
 
-    results = await db.scalars(query)
-    return list(results.all())
+
+async def get_dictionaries(db: AsyncSession) -> dict[str, list]:
+    """
+    Gets oils, delivery bases and delivery types from the in-process copy.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+
+    Returns:
+        dict[str, list]: Sorted IDs of oils and delivery types, and delivery bases with names.
+    """
+    return await dictionaries_snapshot.get(db)
@@ -1,55 +1,73 @@
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from time import time
 
-from aiohttp import ClientSession
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
-from fastapi_cache import FastAPICache
 
+from src.config import START_DATE
 from src.models import dbh
-from src.service_layer.parser.data_parser import parse_trading_results
+from src.service_layer.commands import create_trading_results_partitions
+from src.service_layer.parser.data_parser import (
+    create_client_session,
+    parse_trading_results,
+)
 from src.service_layer.parser.links_parser import get_new_trading_results_links
 from src.service_layer.queries import get_dates
+from src.service_layer.warmup import warm_up_cache
 
 log = logging.getLogger(__name__)
 
 
-async def main_parser():
+async def create_partitions():
     """
-    Main function to parse and save trading results.
+    Create partitions of trading results table up to the next year.
+
+    Errors are logged, results of years without partitions are saved
+    to the default partition.
     """
-    async with dbh.session_factory() as db:
-        result = await get_dates(db=db, days=1)
-        if result:
-            earliest_date = result[0]
-        else:
-            earliest_date = "20221231"
-        log.info(f"Earliest date: {earliest_date}.")
-    t0 = time()
-    async with ClientSession() as session:
-        links = await get_new_trading_results_links(session, earliest_date)
-    if links:
-        await parse_trading_results(links)
-        log.info(f"Finished. Execution time {time() - t0:.3f} second")
-    else:
-        log.info("No new trading results found.")
+    try:
+        async with dbh.session_factory() as db:
+            partitions = await create_trading_results_partitions(
+                db, range(START_DATE.year, date.today().year + 2)
+            )
+            await db.commit()
+    except Exception as e:
+        log.error(f"Error creating partitions: {e}.")
+        return
+    if partitions:
+        log.info(f"Created partitions: {', '.join(partitions)}.")
 
 
-async def cache_clear():
+async def main_parser():
     """
-    Clear redis cache.
+    Main function to parse and save trading results.
+
+    Links of all dates missing from the trading calendar are fetched, so days
+    skipped by a failed download, parse or write are retried by the next run.
+    When new trading results are saved, hot queries are replayed
+    to fill the cache of responses before users request them.
     """
-    try:
-        await FastAPICache.clear()
-        log.info("Cache cleared")
-    except Exception as e:
-        log.error(f"Error cleaning cache: {e}.")
+    await create_partitions()
+    async with dbh.session_factory() as db:
+        loaded_dates = set(await get_dates(db=db, days=None))
+    log.info(f"Loaded dates: {len(loaded_dates)}.")
+    t0 = time()
+    async with create_client_session() as session:
+        links = await get_new_trading_results_links(session, loaded_dates=loaded_dates)
+        if links:
+            await parse_trading_results(links, session)
+            log.info(f"Finished. Execution time {time() - t0:.3f} second")
+            await warm_up_cache()
+        else:
+            log.info("No new trading results found.")
 
 
 def add_jobs_to_scheduler(scheduler):
     """
-    Add jobs to parse data and to clean cache to scheduler.
+    Add jobs to parse data to scheduler.
+
+    Cached responses are invalidated by the parser for the loaded dates.
     """
 
     first_runtime = datetime.now()
@@ -65,12 +83,6 @@ def add_jobs_to_scheduler(scheduler):
         id="add_trading_results_job",
         replace_existing=True,
     )
-    scheduler.add_job(
-        func=cache_clear,
-        trigger=CronTrigger(hour=14, minute=11, timezone="Europe/Moscow"),
-        id="clear_redis_cache",
-        replace_existing=True,
-    )
     scheduler.start()
     log.warning("Start scheduler.")
     return scheduler
@@ -0,0 +1,143 @@
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models import (
+    ORMDeliveryBasis,
+    ORMDeliveryType,
+    ORMLastTradingResult,
+    ORMOil,
+)
+from src.models.schemas import TRADING_RESULT_SCHEMA_FIELDS
+
+T = TypeVar("T")
+
+# Snapshots of the process by their names.
+snapshots: dict[str, "Snapshot"] = {}
+
+
+class Snapshot(Generic[T]):
+    """
+    In-process copy of data loaded from the database.
+
+    The copy is loaded on first use and reloaded when it is older than
+    max_age seconds or invalidated after ingestion, so every worker
+    serves the data from memory most of the time. Each invalidation starts
+    a new generation, and data loaded during an older one is not kept.
+    """
+
+    def __init__(
+        self, name: str, load: Callable[[AsyncSession], Awaitable[T]], max_age: float
+    ):
+        """
+        Initializes an empty snapshot copy and registers it by the name.
+
+        Args:
+            name (str): The name to invalidate the snapshot by in other processes.
+            load (Callable): The coroutine function loading the data.
+            max_age (float): The maximum age of the copy in seconds.
+        """
+        self.name = name
+        self.load = load
+        self.max_age = max_age
+        self.data: T | None = None
+        self.loaded_at = 0.0
+        self.generation = 0
+        self._lock = asyncio.Lock()
+        snapshots[name] = self
+
+    def is_fresh(self) -> bool:
+        return self.data is not None and monotonic() - self.loaded_at < self.max_age
+
+    async def get(self, db: AsyncSession) -> T:
+        """
+        Gets the data, reloading it if needed.
+
+        Args:
+            db (AsyncSession): Asynchronous session with the database.
+
+        Returns:
+            T: The loaded data.
+        """
+        if not self.is_fresh():
+            async with self._lock:
+                if not self.is_fresh():
+                    generation = self.generation
+                    data = await self.load(db)
+                    if generation != self.generation:
+                        # Invalidated while loading, the data may be outdated.
+                        return data
+                    self.data = data
+                    self.loaded_at = monotonic()
+        return self.data
+
+    def invalidate(self) -> None:
+        """
+        Drops the copy and starts a new generation, so it is reloaded on next use.
+        """
+        self.generation += 1
+        self.data = None
+
+
+async def load_last_results(db: AsyncSession) -> list[Row]:
+    """
+    Loads the snapshot of the latest trading day.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+
+    Returns:
+        list[Row]: Trading results of the latest trading day as rows of the API fields.
+    """
+    results = await db.execute(
+        select(
+            *(
+                getattr(ORMLastTradingResult, field)
+                for field in TRADING_RESULT_SCHEMA_FIELDS
+            )
+        )
+    )
+    return list(results.all())
+
+
+async def load_dictionaries(db: AsyncSession) -> dict[str, list]:
+    """
+    Loads oils, delivery bases and delivery types.
+
+    Args:
+        db (AsyncSession): Asynchronous session with the database.
+
+    Returns:
+        dict[str, list]: Sorted IDs of oils and delivery types, and delivery bases with names.
+    """
+    oils = await db.scalars(select(ORMOil.oil_id).order_by(ORMOil.oil_id))
+    delivery_bases = await db.execute(
+        select(
+            ORMDeliveryBasis.delivery_basis_id, ORMDeliveryBasis.delivery_basis_name
+        ).order_by(ORMDeliveryBasis.delivery_basis_id)
+    )
+    delivery_types = await db.scalars(
+        select(ORMDeliveryType.delivery_type_id).order_by(
+            ORMDeliveryType.delivery_type_id
+        )
+    )
+    return {
+        "oils": list(oils.all()),
+        "delivery_bases": [
+            {"delivery_basis_id": basis_id, "delivery_basis_name": basis_name}
+            for basis_id, basis_name in delivery_bases.all()
+        ],
+        "delivery_types": list(delivery_types.all()),
+    }
+
+
+last_results_snapshot = Snapshot(
+    "last-results", load_last_results, max_age=settings.cache.last_results_max_age
+)
+dictionaries_snapshot = Snapshot(
+    "dictionaries", load_dictionaries, max_age=settings.cache.dictionaries_max_age
+)
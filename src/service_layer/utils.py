@@ -1,10 +1,17 @@
+import base64
+import binascii
+import hashlib
 import re
-from datetime import date
+from datetime import date, datetime
 
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 from starlette.responses import Response
 
+from src.config import START_DATE
+from src.models.schemas import DIMENSIONS
+
 
 def get_date_from_link(link: str) -> str | None:
     """
@@ -24,9 +31,9 @@ def get_date_from_link(link: str) -> str | None:
 
 
 def validate_dates_interval(
-    start_date: date,
-    end_date: date,
-) -> tuple[str | date, str]:
+    start_date: date | None,
+    end_date: date | None,
+) -> tuple[date, date]:
     """
     Validate start and end dates.
 
@@ -35,17 +42,13 @@ def validate_dates_interval(
         end_date (date | None): End of the period for analysis of dynamics.
 
     Returns:
-        start_date (date | None): Validated beginning of the period for analysis of dynamics.
-        end_date (date | None): Validated end of the period for analysis of dynamics.
+        start_date (date): Validated beginning of the period for analysis of dynamics.
+        end_date (date): Validated end of the period for analysis of dynamics.
     """
-    if start_date:
-        start_date = start_date.strftime("%Y%m%d")
-    if not start_date or start_date < "20230101":
-        start_date = "20230101"
-    if end_date:
-        end_date = end_date.strftime("%Y%m%d")
-    else:
-        end_date = date.today().strftime("%Y%m%d")
+    if not start_date or start_date < START_DATE:
+        start_date = START_DATE
+    if not end_date:
+        end_date = date.today()
     if start_date > end_date:
         raise HTTPException(
             status_code=400, detail="Start date should be less or equal to end date"
@@ -53,6 +56,39 @@ def validate_dates_interval(
     return start_date, end_date
 
 
+def encode_cursor(trading_date: date, exchange_product_id: str) -> str:
+    """
+    Encodes the position of the last trading result of a page as an opaque cursor.
+
+    Args:
+        trading_date (date): The date of the last trading result of the page.
+        exchange_product_id (str): The exchange product ID of the last trading result.
+
+    Returns:
+        str: The URL-safe cursor of the next page.
+    """
+    position = f"{trading_date:%Y%m%d}:{exchange_product_id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, str]:
+    """
+    Decodes the cursor of a page.
+
+    Args:
+        cursor (str): The cursor made by encode_cursor.
+
+    Returns:
+        tuple[date, str]: The date and the exchange product ID the page starts after.
+    """
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        trading_date, exchange_product_id = position.decode().split(":", 1)
+        return datetime.strptime(trading_date, "%Y%m%d").date(), exchange_product_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 def set_filters(
     oil_id: str | None, delivery_type_id: str | None, delivery_basis_id: str | None
 ) -> dict[str, str | None]:
@@ -77,33 +113,68 @@ def set_filters(
     return filters
 
 
-def request_key_builder(
+def date_bucket(end_date: date | None) -> str:
+    """
+    Names the cache namespace of responses for a period ending on the given date.
+
+    Periods ending today or later, or without an end date, may include results
+    loaded later, so they share the "open" namespace. Periods ending in the past
+    are put into the namespace of their end date.
+
+    Args:
+        end_date (date | None): End of the period.
+
+    Returns:
+        str: "open" or the end date in the format "YYYYMMDD".
+    """
+    if end_date is None or end_date >= date.today():
+        return "open"
+    return end_date.strftime("%Y%m%d")
+
+
+def canonical_key_builder(
     func,
     namespace: str = "",
     *,
     request: Request = None,
     response: Response = None,
-    **kwargs,
+    args: tuple = (),
+    kwargs: dict | None = None,
 ):
     """
-    Builds a cache key.
+    Builds a cache key from the normalized arguments of the cached function.
 
-    Uses the request method, URL and query string as a cache key.
+    Requests with equal filters, dimensions and date intervals get the same key
+    regardless of the query string. Arguments of a period are expected to be
+    validated, and the key is put into the namespace of the end date of the period,
+    so cached responses are invalidated by the dates of loaded results.
+    The arguments are hashed, so keys are of a fixed length.
 
     Args:
         func: The function to be cached.
         namespace: An optional namespace string.
         request: An optional Request object.
         response: An optional Response object.
-        **kwargs: Additional keyword arguments that will be included in the key.
+        args: Positional arguments of the function.
+        kwargs: Keyword arguments of the function.
 
     Returns:
         A string representing the cache key.
     """
-    
-    return ":".join([
-        namespace,
-        request.method.lower(),
-        request.url.path,
-        repr(sorted(request.query_params.items()))
-    ])
+    params = {
+        name: value
+        for name, value in (kwargs or {}).items()
+        if not isinstance(value, (Request, Response, AsyncSession))
+    }
+    if "filters" in params:
+        params["filters"] = sorted(params["filters"].items())
+    if "group_by" in params:
+        params["group_by"] = sorted(set(params["group_by"]), key=DIMENSIONS.index)
+    if "end_date" in params:
+        namespace = f"{namespace}:{date_bucket(params['end_date'])}"
+    digest = hashlib.sha256(
+        repr(
+            (func.__module__, func.__qualname__, args, sorted(params.items()))
+        ).encode()
+    ).hexdigest()
+    return f"{namespace}:{digest}"
@@ -0,0 +1,59 @@
+import logging
+from time import time
+from typing import Iterable
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.config import settings
+from src.routers import router
+
+log = logging.getLogger(__name__)
+
+# Application serving replayed queries in process, without the scheduler of the main one.
+warmup_app = FastAPI()
+warmup_app.include_router(router)
+
+
+async def warm_up_cache(
+    queries: Iterable[str] | None = None, app: FastAPI = warmup_app
+) -> int:
+    """
+    Replays hot queries through the API routes to fill the cache of responses.
+
+    Queries are sent one by one in process, so they are cached with the same
+    keys as requests of users without loading the database with all of them
+    at once.
+
+    Args:
+        queries (Iterable[str] | None): Paths with query strings to replay,
+            settings.cache.warmup_queries by default.
+        app (FastAPI): The application to send queries to.
+
+    Returns:
+        int: Number of queries answered successfully.
+    """
+    if queries is None:
+        queries = settings.cache.warmup_queries
+    t0 = time()
+    warmed = 0
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://warmup"
+    ) as client:
+        for query in queries:
+            try:
+                response = await client.get(query)
+            except Exception as e:
+                log.error(f"Error warming up cache with {query}: {e}.")
+                continue
+            if response.status_code == 200:
+                warmed += 1
+            else:
+                log.warning(
+                    f"Warming up cache with {query} returned {response.status_code}."
+                )
+    log.info(
+        f"Warmed up cache with {warmed} queries. "
+        f"Execution time {time() - t0:.3f} seconds."
+    )
+    return warmed
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+from fastapi.responses import Response
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from src.config import settings
+from src.service_layer.cache import (
+    JSONResponseCoder,
+    LinkedJSONResponseCoder,
+    LocalCache,
+    TwoTierBackend,
+    coalesced_cache,
+    compute_once,
+    invalidate_snapshots,
+)
+from src.service_layer.snapshots import Snapshot
+from src.service_layer.utils import canonical_key_builder
+
+
+def test_linked_json_response_coder():
+    link = '</?cursor=abc>; rel="next"'
+    value = LinkedJSONResponseCoder.encode(
+        Response(content=b"[1]", headers={"Link": link})
+    )
+    for cached in (value, value.decode()):
+        response = LinkedJSONResponseCoder.decode_as_type(cached, type_=None)
+        assert response.body == b"[1]"
+        assert response.headers["link"] == link
+    value = LinkedJSONResponseCoder.encode(Response(content=b"[]"))
+    assert (
+        "link" not in LinkedJSONResponseCoder.decode_as_type(value, type_=None).headers
+    )
+
+
+def test_local_cache(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("src.service_layer.cache.monotonic", lambda: now)
+    cache = LocalCache(max_size=10, max_age=60)
+    cache.set("ns:first", b"12345")
+    cache.set("ns:second", b"12345", ttl=30)
+    assert cache.get("ns:first") == (-1, b"12345")
+    cache.set("other:third", b"123")
+    assert cache.get("ns:second") is None
+    assert cache.size == 8
+    cache.set("too-large", b"12345678901")
+    assert cache.get("too-large") is None
+
+    now += 60
+    assert cache.get("ns:first") is None
+    assert cache.get("other:third") is None
+    assert cache.size == 0
+
+    cache.set("ns:first", b"1", ttl=30)
+    cache.set("other:second", b"2")
+    now += 10
+    assert cache.get("ns:first") == (20, b"1")
+    assert cache.clear(namespace="ns") == 1
+    assert cache.get("ns:first") is None
+    assert cache.clear(key="other:second") == 1
+    assert cache.size == 0
+
+    cache.set("ns:cyrillic", "Нефть")
+    assert cache.size == 10
+    cache.set("ns:too-large", "Бензин")
+    assert cache.get("ns:too-large") is None
+
+
+async def test_two_tier_backend():
+    shared = InMemoryBackend()
+    redis = AsyncMock()
+    backend = TwoTierBackend(shared, LocalCache(max_size=1024, max_age=60), redis)
+    other = TwoTierBackend(shared, LocalCache(max_size=1024, max_age=60), redis)
+
+    await backend.set("two-tier:key", b"value", expire=60)
+    assert await other.get("two-tier:key") == b"value"
+    await shared.clear(key="two-tier:key")
+    assert await other.get_with_ttl("two-tier:key") == (60, b"value")
+
+    assert await backend.clear(namespace="two-tier") == 0
+    assert await backend.get("two-tier:key") is None
+    message = redis.publish.await_args.args[1]
+    assert json.loads(message)["namespace"] == "two-tier"
+    backend.receive(message)
+    assert other.local.get("two-tier:key") is not None
+    other.receive(message)
+    assert await other.get("two-tier:key") is None
+
+
+async def test_compute_once_with_lock(monkeypatch):
+    monkeypatch.setattr(settings.cache, "lock_poll_interval", 0)
+    redis = AsyncMock()
+    backend = TwoTierBackend(
+        InMemoryBackend(), LocalCache(max_size=1024, max_age=60), redis
+    )
+    monkeypatch.setattr(
+        "src.service_layer.cache.FastAPICache.get_backend", lambda: backend
+    )
+    func = AsyncMock(return_value=b"computed")
+
+    redis.set.return_value = True
+    args = ("lock:key", func, JSONResponseCoder, None)
+    assert await compute_once(*args) == b"computed"
+    assert redis.set.await_args.args == ("lock:key:lock", backend.worker_id)
+    assert backend.locks == {"lock:key"}
+    await backend.set("lock:key", b"cached", expire=60)
+    assert backend.locks == set()
+    redis.eval.assert_awaited_once()
+
+    redis.set.return_value = None
+    response = await compute_once(*args)
+    assert response.body == b"cached"
+    func.assert_awaited_once()
+
+
+async def test_compute_once_when_redis_fails(monkeypatch):
+    redis = AsyncMock()
+    redis.set.side_effect = ConnectionError("Redis is down")
+    redis.eval.side_effect = ConnectionError("Redis is down")
+    backend = TwoTierBackend(
+        InMemoryBackend(), LocalCache(max_size=1024, max_age=60), redis
+    )
+    monkeypatch.setattr(
+        "src.service_layer.cache.FastAPICache.get_backend", lambda: backend
+    )
+    func = AsyncMock(return_value=b"computed")
+    args = ("redis-down:key", func, JSONResponseCoder, None)
+    assert await compute_once(*args) == b"computed"
+    assert backend.locks == set()
+    backend.locks.add("redis-down:key")
+    await backend.unlock("redis-down:key")
+    assert backend.locks == set()
+
+
+async def test_coalesced_cache_stores_once(monkeypatch):
+    shared = InMemoryBackend()
+    backend = TwoTierBackend(shared, LocalCache(max_size=1024, max_age=60))
+    monkeypatch.setattr(
+        "src.service_layer.cache.FastAPICache.get_backend", lambda: backend
+    )
+    monkeypatch.setattr(
+        "fastapi_cache.decorator.FastAPICache.get_backend", lambda: backend
+    )
+    mock_set = AsyncMock(wraps=shared.set)
+    monkeypatch.setattr(shared, "set", mock_set)
+
+    @coalesced_cache(key_builder=canonical_key_builder, namespace="coalesced")
+    async def get_value(number: int) -> list[int]:
+        await asyncio.sleep(0.05)
+        return [number]
+
+    results = await asyncio.gather(*(get_value(number=1) for _ in range(3)))
+    assert results == [[1], [1], [1]]
+    mock_set.assert_awaited_once()
+
+
+async def test_snapshot_drops_data_loaded_before_invalidation():
+    loading = asyncio.Event()
+    loaded = asyncio.Event()
+    versions = iter(["old", "new"])
+
+    async def load(db):
+        loading.set()
+        await loaded.wait()
+        return next(versions)
+
+    snapshot = Snapshot("test-generation", load, max_age=60)
+    task = asyncio.create_task(snapshot.get(None))
+    await loading.wait()
+    snapshot.invalidate()
+    loaded.set()
+    assert await task == "old"
+    assert snapshot.data is None
+    assert await snapshot.get(None) == "new"
+
+
+async def test_invalidate_snapshots_in_other_workers(monkeypatch):
+    redis = AsyncMock()
+    backend = TwoTierBackend(
+        InMemoryBackend(), LocalCache(max_size=1024, max_age=60), redis
+    )
+    other = TwoTierBackend(
+        InMemoryBackend(), LocalCache(max_size=1024, max_age=60), redis
+    )
+    monkeypatch.setattr(
+        "src.service_layer.cache.FastAPICache.get_backend", lambda: backend
+    )
+    snapshot = Snapshot("test-broadcast", AsyncMock(return_value=[1]), max_age=60)
+    assert await snapshot.get(None) == [1]
+    await invalidate_snapshots(snapshot)
+    assert snapshot.data is None
+    message = redis.publish.await_args.args[1]
+    assert json.loads(message)["snapshot"] == "test-broadcast"
+
+    await snapshot.get(None)
+    backend.receive(message)
+    assert snapshot.data == [1]
+    other.receive(message)
+    assert snapshot.data is None
@@ -1,14 +1,31 @@
+from datetime import date
+
+import pandas as pd
 import pytest
 import pytest_asyncio
 
 from typing import Any, AsyncGenerator
 from fastapi import FastAPI
 from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import insert
 
-from src.models import ORMTradingResult
-from src.models.domain import TradingResult
+from src.service_layer.commands import (
+    refresh_last_trading_results,
+    update_daily_trading_totals,
+    update_trading_days,
+    upsert_trading_results,
+)
+from src.service_layer.parser.results_generator import (
+    BASIS_NAME_COLUMN,
+    COUNT_COLUMN,
+    PRODUCT_ID_COLUMN,
+    PRODUCT_NAME_COLUMN,
+    TOTAL_COLUMN,
+    VOLUME_COLUMN,
+    columns_to_records,
+    generate_trading_result_columns,
+)
 from tests.conftest import app, test_db
 
 exchange_product_ids = [
@@ -18,30 +35,48 @@ exchange_product_ids = [
     "A100NVY060F",
     "A100STI060F",
 ]
-dates = ["20230101", "20230102", "20230103", "20240101", "20250101"]
-test_data = [
-    TradingResult(
-        exchange_product_id=exchange_product_id,
-        exchange_product_name="Product",
-        delivery_basis_name="Basis",
-        volume=10,
-        total=100000,
-        count=1,
-        date=date,
-    ).to_dict()
-    for exchange_product_id in exchange_product_ids
-    for date in dates
+dates = [
+    date(2023, 1, 1),
+    date(2023, 1, 2),
+    date(2023, 1, 3),
+    date(2024, 1, 1),
+    date(2025, 1, 1),
 ]
 
 
+def make_records(trading_date: date) -> list[dict]:
+    """
+    Builds trading results of the products for the date as the parser does.
+    """
+    size = len(exchange_product_ids)
+    data = pd.DataFrame(
+        {
+            PRODUCT_ID_COLUMN: [None, *exchange_product_ids, "Итого:", "Итого:"],
+            PRODUCT_NAME_COLUMN: [None, *["Product"] * size, None, None],
+            BASIS_NAME_COLUMN: [None, *["Basis"] * size, None, None],
+            VOLUME_COLUMN: [None, *[10] * size, None, None],
+            TOTAL_COLUMN: [None, *[100000] * size, None, None],
+            COUNT_COLUMN: [None, *[1] * size, None, None],
+        }
+    )
+    link = f"oil_xls_{trading_date:%Y%m%d}162000.xls"
+    return columns_to_records(generate_trading_result_columns(data, link))
+
+
+test_data = [record for trading_date in dates for record in make_records(trading_date)]
+
+
 @pytest_asyncio.fixture(scope="package", autouse=True)
 async def prepare_database():
     """
     Prepare testing database for tests.
     """
-    async with test_db.engine.begin() as conn:
-        await conn.execute(insert(ORMTradingResult), test_data)
-        await conn.commit()
+    async with test_db.session_factory() as session:
+        await upsert_trading_results(session, test_data)
+        await update_trading_days(session, dates)
+        await update_daily_trading_totals(session, dates)
+        await refresh_last_trading_results(session)
+        await session.commit()
     yield
 
 
@@ -69,3 +104,14 @@ async def in_memory_cache_clear():
     Disable cache for testing.
     """
     return await FastAPICache.clear()
+
+
+@pytest.fixture(autouse=True)
+def frozen_cache_clock(monkeypatch):
+    """
+    Freeze the clock of the in-memory cache.
+
+    Entries cached without expiration live until the next second
+    in the in-memory backend, so cache hits would depend on timing.
+    """
+    monkeypatch.setattr(InMemoryBackend, "_now", property(lambda self: 0))
@@ -1,14 +1,20 @@
+import asyncio
 from datetime import date
 from unittest.mock import AsyncMock
 
 import pytest
 
+from src.config import settings
+from src.service_layer.cache import invalidate_cached_dates
 from src.service_layer.queries import (
+    get_aggregated_trading_results,
     get_dates,
+    get_dictionaries,
     get_filtered_trading_results,
     get_last_results,
 )
-from src.service_layer.utils import set_filters
+from src.service_layer.utils import encode_cursor, set_filters
+from src.service_layer.warmup import warm_up_cache
 
 
 @pytest.mark.asyncio
@@ -127,6 +133,38 @@ class TestAPI:
             f"/?oil_id={oil_id}, delivery_type_id={delivery_type_id}, delivery_basis_id={delivery_basis_id}, start_date={start_date}, end_date={end_date}"
         )
         assert response.json() == results
+        assert "link" not in response.headers
+
+    async def test_get_dynamics_pages(self, client, get_async_session, monkeypatch):
+        mock_get_filtered_trading_results = AsyncMock(
+            return_value=await get_filtered_trading_results(
+                get_async_session, {"oil_id": "A100"}, limit=3
+            )
+        )
+        monkeypatch.setattr(
+            "src.routers.get_filtered_trading_results",
+            mock_get_filtered_trading_results,
+        )
+        response = await client.get("/?oil_id=A100&limit=2")
+        assert [result["exchange_product_id"] for result in response.json()] == [
+            "A100STI060F",
+            "A100NVY060F",
+        ]
+        next_cursor = encode_cursor(date(2025, 1, 1), "A100NVY060F")
+        next_url = f"/?oil_id=A100&limit=2&cursor={next_cursor}"
+        assert response.headers["link"] == f'<{next_url}>; rel="next"'
+        assert mock_get_filtered_trading_results.await_args.kwargs["limit"] == 3
+
+        response = await client.get(next_url)
+        assert mock_get_filtered_trading_results.await_args.kwargs["after"] == (
+            date(2025, 1, 1),
+            "A100NVY060F",
+        )
+        assert response.headers["x-fastapi-cache"] == "MISS"
+        response = await client.get(next_url)
+        assert response.headers["x-fastapi-cache"] == "HIT"
+        assert (await client.get("/?cursor=invalid")).status_code == 400
+        assert (await client.get("/?limit=0")).status_code == 422
 
     @pytest.mark.parametrize(
         "oil_id, delivery_type_id, delivery_basis_id, results",
@@ -204,3 +242,107 @@ class TestAPI:
             f"/last?oil_id={oil_id}, delivery_type_id={delivery_type_id}, delivery_basis_id={delivery_basis_id}"
         )
         assert response.json() == results
+
+    async def test_get_totals(self, client, get_async_session, monkeypatch):
+        mock_get_aggregated_trading_results = AsyncMock(
+            return_value=await get_aggregated_trading_results(
+                get_async_session, ["oil_id", "delivery_type_id"], {}, date(2025, 1, 1)
+            )
+        )
+        monkeypatch.setattr(
+            "src.routers.get_aggregated_trading_results",
+            mock_get_aggregated_trading_results,
+        )
+        response = await client.get(
+            "/totals?group_by=oil_id&group_by=delivery_type_id&start_date=2025-01-01"
+        )
+        assert response.json() == [
+            dict(
+                oil_id="A100",
+                delivery_type_id="A",
+                volume=20,
+                total=200000,
+                count=2,
+                average_price=10000.0,
+            ),
+            dict(
+                oil_id="A100",
+                delivery_type_id="F",
+                volume=30,
+                total=300000,
+                count=3,
+                average_price=10000.0,
+            ),
+        ]
+        assert mock_get_aggregated_trading_results.await_args.kwargs["group_by"] == [
+            "oil_id",
+            "delivery_type_id",
+        ]
+        assert (await client.get("/totals?group_by=volume")).status_code == 422
+
+    async def test_get_trading_dictionaries(
+        self, client, get_async_session, monkeypatch
+    ):
+        dictionaries = await get_dictionaries(get_async_session)
+        monkeypatch.setattr(
+            "src.routers.get_dictionaries", AsyncMock(return_value=dictionaries)
+        )
+        response = await client.get("/dictionaries")
+        assert response.json() == dictionaries
+        assert response.json()["delivery_types"] == ["A", "F"]
+
+    async def test_invalidate_cached_dates(self, client, monkeypatch):
+        urls = ["/dates?days=3", "/?end_date=2024-01-01", "/?start_date=2024-01-01"]
+
+        async def cache_statuses():
+            return [(await client.get(url)).headers["x-fastapi-cache"] for url in urls]
+
+        await cache_statuses()
+        assert await cache_statuses() == ["HIT", "HIT", "HIT"]
+        await invalidate_cached_dates([date.today()])
+        assert await cache_statuses() == ["MISS", "HIT", "MISS"]
+        monkeypatch.setattr(settings.cache, "invalidation_max_days", 10000)
+        await invalidate_cached_dates([date(2024, 1, 2)])
+        assert await cache_statuses() == ["MISS", "HIT", "MISS"]
+        await invalidate_cached_dates([date(2024, 1, 1)])
+        assert await cache_statuses() == ["MISS", "MISS", "MISS"]
+
+    async def test_coalesce_cache_misses(self, client, get_async_session, monkeypatch):
+        results = await get_filtered_trading_results(
+            get_async_session, {"oil_id": "A100"}
+        )
+
+        async def get_results_slowly(**kwargs):
+            await asyncio.sleep(0.1)
+            return results
+
+        mock_get_filtered_trading_results = AsyncMock(side_effect=get_results_slowly)
+        monkeypatch.setattr(
+            "src.routers.get_filtered_trading_results",
+            mock_get_filtered_trading_results,
+        )
+        responses = await asyncio.gather(
+            *(client.get("/?oil_id=A100&limit=3") for _ in range(5))
+        )
+        mock_get_filtered_trading_results.assert_awaited_once()
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.content for response in responses}) == 1
+
+    async def test_canonical_cache_keys(self, client):
+        urls = [
+            "/totals?oil_id=A100&start_date=2022-01-01",
+            "/totals?start_date=2023-01-01&delivery_type_id=&oil_id=A100",
+            f"/totals?oil_id=A100&end_date={date.today()}",
+        ]
+        statuses = [(await client.get(url)).headers["x-fastapi-cache"] for url in urls]
+        assert statuses == ["MISS", "HIT", "HIT"]
+
+    async def test_warm_up_cache(self, app, client):
+        queries = ["/dates?days=4", "/?oil_id=A100&limit=1", "/?oil_id=missing"]
+        assert await warm_up_cache(queries, app=app) == 2
+        response = await client.get("/?limit=1&oil_id=A100")
+        assert response.headers["x-fastapi-cache"] == "HIT"
+        assert response.headers["link"].startswith("</?oil_id=A100&limit=1&cursor=")
+        assert len(response.json()) == 1
+        response = await client.get("/dates?days=4")
+        assert response.headers["x-fastapi-cache"] == "HIT"
@@ -0,0 +1,230 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select, func, text
+
+from src.models import (
+    ORMDailyTradingTotal,
+    ORMLastTradingResult,
+    ORMProduct,
+    ORMTradingDay,
+    ORMTradingResult,
+)
+from src.service_layer.commands import (
+    create_trading_results_partitions,
+    refresh_last_trading_results,
+    update_daily_trading_totals,
+    update_trading_days,
+    upsert_trading_results,
+)
+from src.service_layer.queries import select_filtered_trading_results
+from src.service_layer.snapshots import load_dictionaries
+
+
+def record(exchange_product_id: str, date: date, volume: int) -> dict:
+    return dict(
+        exchange_product_id=exchange_product_id,
+        exchange_product_name="Product",
+        oil_id=exchange_product_id[:4],
+        delivery_basis_id=exchange_product_id[4:7],
+        delivery_basis_name="Basis",
+        delivery_type_id=exchange_product_id[-1],
+        volume=volume,
+        total=100000,
+        count=1,
+        date=date,
+    )
+
+
+@pytest.mark.asyncio
+class TestCommands:
+
+    async def test_upsert_trading_results(self, get_async_session):
+        records = [
+            record("A100ABS025A", date(2023, 1, 1), 20),
+            record("A100ABS025A", date(2023, 1, 1), 20),
+            record("A100ABS025A", date(2026, 1, 1), 40),
+        ]
+        try:
+            assert await upsert_trading_results(get_async_session, records) == 2
+            assert await upsert_trading_results(get_async_session, records) == 2
+            volumes = await get_async_session.scalars(
+                select(ORMTradingResult.volume)
+                .filter_by(exchange_product_id="A100ABS025A")
+                .order_by(ORMTradingResult.date)
+            )
+            assert volumes.all() == [20, 10, 10, 10, 10, 40]
+            names = await get_async_session.scalars(
+                select(ORMProduct.exchange_product_name).filter_by(
+                    exchange_product_id="A100ABS025A"
+                )
+            )
+            assert names.all() == ["Product"]
+            assert (
+                await get_async_session.scalar(
+                    select(func.count()).select_from(ORMTradingResult)
+                )
+                == 26
+            )
+        finally:
+            await get_async_session.rollback()
+
+    async def test_upsert_dictionaries(self, get_async_session):
+        records = [
+            dict(
+                record("A100ABS025A", date(2026, 1, 1), 40), delivery_basis_name="New"
+            ),
+            record("B200XYZ025F", date(2026, 1, 1), 40),
+        ]
+        try:
+            await upsert_trading_results(get_async_session, records)
+            dictionaries = await load_dictionaries(get_async_session)
+            assert dictionaries["oils"] == ["A100", "B200"]
+            assert dictionaries["delivery_bases"][0] == {
+                "delivery_basis_id": "ABS",
+                "delivery_basis_name": "New",
+            }
+            assert dictionaries["delivery_bases"][-1]["delivery_basis_id"] == "XYZ"
+            assert (
+                await get_async_session.scalar(
+                    select(func.count()).select_from(ORMProduct)
+                )
+                == 6
+            )
+        finally:
+            await get_async_session.rollback()
+
+    async def test_upsert_dictionaries_in_reverse_date_order(self, get_async_session):
+        batches = [
+            [
+                dict(
+                    record("C300ABS025A", date(2026, 1, 1), 40),
+                    exchange_product_name="New name",
+                )
+            ],
+            [
+                dict(
+                    record("C300ABS025A", date(2025, 6, 1), 40),
+                    exchange_product_name="Old name",
+                )
+            ],
+        ]
+        try:
+            for batch in batches:
+                await upsert_trading_results(get_async_session, batch)
+            product = await get_async_session.scalar(
+                select(ORMProduct).filter_by(exchange_product_id="C300ABS025A")
+            )
+            assert product.exchange_product_name == "New name"
+            assert product.name_date == date(2026, 1, 1)
+        finally:
+            await get_async_session.rollback()
+
+    async def test_update_trading_days(self, get_async_session):
+        try:
+            await upsert_trading_results(
+                get_async_session,
+                [
+                    record("A100ABS025A", date(2026, 1, 1), 40),
+                    record("A100ANK060F", date(2026, 1, 1), 40),
+                ],
+            )
+            await update_trading_days(
+                get_async_session, [date(2026, 1, 1), date(2025, 1, 1)]
+            )
+            days = await get_async_session.execute(
+                select(ORMTradingDay.date, ORMTradingDay.results_count).order_by(
+                    ORMTradingDay.date.desc()
+                )
+            )
+            assert days.all()[:3] == [
+                (date(2026, 1, 1), 2),
+                (date(2025, 1, 1), 5),
+                (date(2024, 1, 1), 5),
+            ]
+        finally:
+            await get_async_session.rollback()
+
+    async def test_update_daily_trading_totals(self, get_async_session):
+        try:
+            await upsert_trading_results(
+                get_async_session,
+                [
+                    record("A100ABS025A", date(2025, 1, 1), 40),
+                    record("A100NFT005A", date(2025, 1, 1), 20),
+                ],
+            )
+            await update_daily_trading_totals(get_async_session, [date(2025, 1, 1)])
+            totals = await get_async_session.execute(
+                select(
+                    ORMDailyTradingTotal.delivery_basis_id,
+                    ORMDailyTradingTotal.volume,
+                    ORMDailyTradingTotal.total,
+                    ORMDailyTradingTotal.count,
+                )
+                .filter_by(date=date(2025, 1, 1), delivery_type_id="A")
+                .order_by(ORMDailyTradingTotal.delivery_basis_id)
+            )
+            assert totals.all() == [("ABS", 40, 100000, 1), ("NFT", 20, 100000, 1)]
+        finally:
+            await get_async_session.rollback()
+
+    async def test_refresh_last_trading_results(self, get_async_session):
+        try:
+            await upsert_trading_results(
+                get_async_session, [record("A100ABS025A", date(2026, 1, 1), 40)]
+            )
+            assert await refresh_last_trading_results(get_async_session) == 1
+            results = await get_async_session.execute(
+                select(
+                    ORMLastTradingResult.exchange_product_id,
+                    ORMLastTradingResult.volume,
+                    ORMLastTradingResult.date,
+                )
+            )
+            assert results.all() == [("A100ABS025A", 40, date(2026, 1, 1))]
+        finally:
+            await get_async_session.rollback()
+
+    async def test_create_trading_results_partitions(self, get_async_session):
+        try:
+            partitions = await create_trading_results_partitions(
+                get_async_session, range(2023, 2026)
+            )
+            assert partitions == [
+                "spimex_trading_results_y2023",
+                "spimex_trading_results_y2024",
+                "spimex_trading_results_y2025",
+            ]
+            assert (
+                await create_trading_results_partitions(
+                    get_async_session, range(2023, 2026)
+                )
+                == []
+            )
+            counts = await get_async_session.execute(
+                text(
+                    "SELECT tableoid::regclass::text, count(*) "
+                    "FROM spimex_trading_results GROUP BY 1 ORDER BY 1"
+                )
+            )
+            assert counts.all() == [
+                ("spimex_trading_results_y2023", 15),
+                ("spimex_trading_results_y2024", 5),
+                ("spimex_trading_results_y2025", 5),
+            ]
+            plan = await get_async_session.scalars(
+                text(
+                    "EXPLAIN "
+                    + str(
+                        select_filtered_trading_results(
+                            {}, date(2024, 1, 1), date(2024, 12, 31)
+                        ).compile(compile_kwargs={"literal_binds": True})
+                    )
+                )
+            )
+            plan = "\n".join(plan.all())
+            assert "spimex_trading_results_y2024" in plan
+            assert "spimex_trading_results_y2023" not in plan
+        finally:
+            await get_async_session.rollback()
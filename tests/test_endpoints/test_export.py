@@ -0,0 +1,146 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+
+import pytest
+
+from src.models import dbh
+from src.service_layer.export import (
+    EXPORT_FIELDS,
+    MEDIA_TYPES,
+    export_trading_results,
+    negotiate_columnar_format,
+)
+from src.service_layer.queries import stream_filtered_trading_results
+from tests.conftest import test_db
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+class TestExport:
+
+    async def test_stream_filtered_trading_results(self, get_async_session):
+        partitions = [
+            partition
+            async for partition in stream_filtered_trading_results(
+                get_async_session,
+                {"delivery_type_id": "A"},
+                date(2023, 1, 2),
+                partition_size=3,
+            )
+        ]
+        assert [len(partition) for partition in partitions] == [3, 3, 2]
+        assert partitions[0][0].exchange_product_id == "A100NFT005A"
+        assert partitions[0][0].date == date(2025, 1, 1)
+
+    @pytest.mark.parametrize("compress", [False, True])
+    async def test_export_trading_results(self, compress, get_async_session):
+        def partitions():
+            return stream_filtered_trading_results(
+                get_async_session,
+                {"oil_id": "A100"},
+                date(2025, 1, 1),
+                partition_size=2,
+            )
+
+        ndjson = await collect(export_trading_results(partitions(), "ndjson", compress))
+        text = await collect(export_trading_results(partitions(), "csv", compress))
+        if compress:
+            ndjson, text = gzip.decompress(ndjson), gzip.decompress(text)
+        lines = [json.loads(line) for line in ndjson.decode().splitlines()]
+        rows = list(csv.DictReader(io.StringIO(text.decode())))
+        assert len(lines) == len(rows) == 5
+        assert lines[0] == dict(
+            exchange_product_id="A100STI060F",
+            exchange_product_name="Product",
+            delivery_basis_name="Basis",
+            volume=10,
+            total=100000,
+            count=1,
+            date="20250101",
+            oil_id="A100",
+            delivery_basis_id="STI",
+            delivery_type_id="F",
+        )
+        assert rows[0] == {key: str(value) for key, value in lines[0].items()}
+
+    async def test_export_without_results(self, get_async_session):
+        partitions = stream_filtered_trading_results(
+            get_async_session, {"oil_id": "A200"}
+        )
+        assert await collect(export_trading_results(partitions, "csv")) == (
+            ",".join(EXPORT_FIELDS).encode() + b"\r\n"
+        )
+
+    @pytest.mark.usefixtures("disable_cache")
+    async def test_export_dynamics(self, client, monkeypatch):
+        monkeypatch.setattr(dbh, "session_factory", test_db.session_factory)
+        response = await client.get(
+            "/export?delivery_type_id=A&format=csv",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.text.splitlines()) == 11
+
+    @pytest.mark.parametrize(
+        "accept, export_format",
+        [
+            ("application/json", None),
+            ("application/vnd.apache.arrow.stream", "arrow"),
+            ("application/json;q=0.5, application/vnd.apache.parquet", "parquet"),
+        ],
+    )
+    async def test_negotiate_columnar_format(self, accept, export_format):
+        assert negotiate_columnar_format(accept) == export_format
+
+    @pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+    async def test_export_columnar(self, export_format, get_async_session):
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        partitions = stream_filtered_trading_results(
+            get_async_session,
+            {"oil_id": "A100"},
+            date(2024, 1, 1),
+            partition_size=3,
+        )
+        data = await collect(export_trading_results(partitions, export_format))
+        if export_format == "arrow":
+            table = pa.ipc.open_stream(data).read_all()
+        else:
+            table = pq.read_table(pa.BufferReader(data))
+        assert table.column_names == list(EXPORT_FIELDS)
+        assert table.num_rows == 10
+        assert table.column("date")[0].as_py() == date(2025, 1, 1)
+        assert table.column("volume").type == pa.int64()
+
+    @pytest.mark.usefixtures("disable_cache")
+    async def test_get_dynamics_columnar(self, client, monkeypatch):
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        monkeypatch.setattr(dbh, "session_factory", test_db.session_factory)
+        response = await client.get(
+            "/?delivery_type_id=A",
+            headers={"Accept": MEDIA_TYPES["arrow"]},
+        )
+        assert response.headers["content-type"] == MEDIA_TYPES["arrow"]
+        assert pa.ipc.open_stream(response.content).read_all().num_rows == 10
+
+        response = await client.get(
+            "/last?delivery_type_id=A",
+            headers={"Accept": MEDIA_TYPES["parquet"]},
+        )
+        assert response.headers["content-type"] == MEDIA_TYPES["parquet"]
+        table = pq.read_table(pa.BufferReader(response.content))
+        assert table.column("exchange_product_id").to_pylist() == [
+            "A100ABS025A",
+            "A100NFT005A",
+        ]
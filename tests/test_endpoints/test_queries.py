@@ -1,11 +1,21 @@
+import re
 from datetime import date
 
 import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 
 from src.service_layer.queries import (
+    get_aggregated_trading_results,
     get_dates,
+    get_dictionaries,
     get_filtered_trading_results,
     get_last_results,
+    select_filtered_trading_results,
+)
+
+INDEX_SCAN_PATTERN = re.compile(
+    r"Index (?:Only )?Scan (?:Backward )?(?:using|on) (\S+)"
 )
 
 
@@ -56,6 +66,17 @@ class TestQueries:
         )
         assert len(db_results) == amount
 
+    @pytest.mark.parametrize("filters", [{}, {"delivery_type_id": "A"}])
+    async def test_get_filtered_trading_results_pages(self, filters, get_async_session):
+        results = await get_filtered_trading_results(get_async_session, filters)
+        pages, after = [], None
+        while page := await get_filtered_trading_results(
+            get_async_session, filters, after=after, limit=2
+        ):
+            pages.extend(page)
+            after = page[-1].date, page[-1].exchange_product_id
+        assert pages == results
+
     @pytest.mark.parametrize(
         "filters, amount",
         [
@@ -76,3 +97,94 @@ class TestQueries:
     async def test_get_last_results(self, filters, amount, get_async_session):
         data = await get_last_results(get_async_session, filters)
         assert len(data) == amount
+
+    async def test_get_dictionaries(self, get_async_session):
+        assert await get_dictionaries(get_async_session) == {
+            "oils": ["A100"],
+            "delivery_bases": [
+                {"delivery_basis_id": basis_id, "delivery_basis_name": "Basis"}
+                for basis_id in ["ABS", "ANK", "NFT", "NVY", "STI"]
+            ],
+            "delivery_types": ["A", "F"],
+        }
+
+    @pytest.mark.parametrize(
+        "group_by, filters, start_date, results",
+        [
+            (
+                ["date"],
+                {},
+                date(2024, 1, 1),
+                [
+                    (date(2025, 1, 1), 50, 500000, 5, 10000.0),
+                    (date(2024, 1, 1), 50, 500000, 5, 10000.0),
+                ],
+            ),
+            (
+                ["delivery_type_id", "oil_id"],
+                {"oil_id": "A100"},
+                date(2024, 1, 1),
+                [
+                    ("A100", "A", 40, 400000, 4, 10000.0),
+                    ("A100", "F", 60, 600000, 6, 10000.0),
+                ],
+            ),
+            (["date"], {"oil_id": "A200"}, None, []),
+        ],
+    )
+    async def test_get_aggregated_trading_results(
+        self, group_by, filters, start_date, results, get_async_session
+    ):
+        rows = await get_aggregated_trading_results(
+            get_async_session, group_by, filters, start_date
+        )
+        assert [tuple(row) for row in rows] == results
+
+    @pytest.mark.parametrize(
+        "query, indexes",
+        [
+            (select_filtered_trading_results({}), {"ix_spimex_trading_results_date"}),
+            (
+                select_filtered_trading_results({"oil_id": "A100"}, date(2024, 1, 1)),
+                {"ix_spimex_trading_results_oil_id_date"},
+            ),
+            (
+                select_filtered_trading_results(
+                    {"delivery_basis_id": "ABS", "delivery_type_id": "A"}
+                ),
+                {
+                    "ix_spimex_trading_results_delivery_basis_id_date",
+                    "ix_spimex_trading_results_delivery_type_id_date",
+                },
+            ),
+            (
+                select_filtered_trading_results({"delivery_type_id": "F"}),
+                {"ix_spimex_trading_results_delivery_type_id_date"},
+            ),
+            (
+                select_filtered_trading_results(
+                    {}, after=(date(2024, 1, 1), "A100ABS025A"), limit=2
+                ),
+                {"ix_spimex_trading_results_date"},
+            ),
+        ],
+    )
+    async def test_query_plans(self, query, indexes, get_async_session):
+        await get_async_session.execute(text("SET LOCAL enable_seqscan = off"))
+        compiled = query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        plan = await get_async_session.scalars(text(f"EXPLAIN {compiled}"))
+        plan = "\n".join(plan.all())
+        assert "Seq Scan" not in plan
+        # Partitions have their own indexes, which are named after the parent ones.
+        used = await get_async_session.scalars(
+            text(
+                "SELECT coalesce(parent.relname, child.relname) FROM pg_class child "
+                "LEFT JOIN pg_inherits ON pg_inherits.inhrelid = child.oid "
+                "LEFT JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE child.relname = ANY(:names)"
+            ),
+            {"names": INDEX_SCAN_PATTERN.findall(plan)},
+        )
+        assert indexes & set(used.all())
@@ -3,6 +3,15 @@ from io import BytesIO
 import pandas as pd
 import pytest
 
+from src.service_layer.parser.file_cache import BulletinCache
+
+
+@pytest.fixture(autouse=True)
+def bulletin_cache(tmp_path, monkeypatch) -> BulletinCache:
+    cache = BulletinCache(tmp_path / "bulletins", max_size=1024 * 1024)
+    monkeypatch.setattr("src.service_layer.parser.data_parser.bulletin_cache", cache)
+    return cache
+
 
 @pytest.fixture()
 def dataframe1():
@@ -93,3 +102,37 @@ def dataframe2():
         "Количество\nДоговоров,\nшт.": [None, 5.0, 1000.0, 1000.0],
     }
     return pd.DataFrame(data)
+
+
+def make_listing_items(dates: list[str]) -> str:
+    return "".join(f"""
+        <div class="accordeon-inner__wrap-item">
+            <div class="accordeon-inner__header">
+                <a class="accordeon-inner__item-title link xls"
+                   href="/upload/reports/oil_xls/oil_xls_{date}162000.xls?r=2186"
+                   target="_blank">Бюллетень по итогам торгов</a>
+            </div>
+        </div>""" for date in dates)
+
+
+def make_listing_page(dates: list[str], other_dates: list[str] = ()) -> str:
+    return f"""
+    <html><body>
+        <div class="page-content__tabs__block">
+            <div class="accordeon-inner">{make_listing_items(dates)}</div>
+        </div>
+        <div class="page-content__aside">{make_listing_items(other_dates)}</div>
+    </body></html>"""
+
+
+@pytest.fixture()
+def listing_pages():
+    return {
+        1: make_listing_page(["20240214", "20240213"]),
+        2: make_listing_page(["20240212", "20240209"]),
+    }
+
+
+@pytest.fixture()
+def listing_page_with_aside():
+    return make_listing_page(["20240214", "20240213"], other_dates=["20240101"])
@@ -0,0 +1,49 @@
+import tarfile
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.bulk_import import import_bulletins, read_bulletins
+
+FILE_NAMES = ["oil_xls_20240212162000.xls", "oil_xls_20240213162000.xls"]
+
+
+@pytest.fixture()
+def bulletins_dir(tmp_path, excel_data):
+    data = excel_data.read()
+    for name in FILE_NAMES:
+        (tmp_path / name).write_bytes(data)
+    (tmp_path / "readme.txt").write_text("Not a bulletin")
+    return tmp_path
+
+
+def test_read_bulletins(bulletins_dir, tmp_path_factory):
+    tarball = tmp_path_factory.mktemp("tar") / "bulletins.tar.gz"
+    with tarfile.open(tarball, "w:gz") as tar:
+        tar.add(bulletins_dir, arcname="bulletins")
+    for path in (bulletins_dir, tarball):
+        assert sorted(name for _, name in read_bulletins(path)) == FILE_NAMES
+
+
+async def test_import_bulletins(bulletins_dir, monkeypatch):
+    mock_write_to_db = AsyncMock(
+        side_effect=lambda records: {record["date"] for record in records}
+    )
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.write_to_db", mock_write_to_db
+    )
+    mock_refresh_derived_data = AsyncMock()
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.refresh_derived_data",
+        mock_refresh_derived_data,
+    )
+    await import_bulletins(bulletins_dir)
+    mock_refresh_derived_data.assert_awaited_once()
+    records = [
+        record for call in mock_write_to_db.await_args_list for record in call.args[0]
+    ]
+    assert sorted(record["date"] for record in records) == [
+        date(2024, 2, 12),
+        date(2024, 2, 13),
+    ]
@@ -1,6 +1,20 @@
+from datetime import date
+from unittest.mock import AsyncMock
+
 import pandas as pd
+import pytest
+from aioresponses import aioresponses
 
-from src.service_layer.parser.data_parser import extract_data_from_file
+from src.config import HOST, settings
+from src.service_layer.parser.data_parser import (
+    create_client_session,
+    extract_data_from_file,
+    get_bytes,
+    parse_trading_results,
+    process_bulletins,
+    refresh_derived_data,
+)
+from src.service_layer.snapshots import dictionaries_snapshot, last_results_snapshot
 
 
 def test_extract_data_from_file(excel_data):
@@ -9,3 +23,95 @@ def test_extract_data_from_file(excel_data):
     assert isinstance(result, pd.DataFrame)
     assert len(result) == 4
     assert result["Количество\nДоговоров,\nшт."].iloc[1] == 5
+
+
+async def test_get_bytes_retries():
+    url = HOST + "/upload/reports/oil_xls/oil_xls_20240212162000.xls"
+    with aioresponses() as mocked:
+        mocked.get(url, status=500)
+        mocked.get(url, body=b"data")
+        async with create_client_session() as session:
+            assert await get_bytes(url, session, retries=1, backoff=0) == b"data"
+
+
+@pytest.mark.parametrize("parse_executor", ["thread", "process"])
+async def test_parse_trading_results(parse_executor, excel_data, monkeypatch):
+    data = excel_data.read()
+    monkeypatch.setattr(settings.parser, "parse_executor", parse_executor)
+    monkeypatch.setattr(settings.parser, "parse_workers", 2)
+    monkeypatch.setattr(settings.parser, "download_retries", 0)
+    missing_link = "/upload/reports/oil_xls/oil_xls_20240215162000.xls"
+    links = {
+        f"/upload/reports/oil_xls/oil_xls_202402{day}162000.xls"
+        for day in range(10, 15)
+    }
+    mock_write_to_db = AsyncMock(
+        side_effect=lambda records: {record["date"] for record in records}
+    )
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.write_to_db", mock_write_to_db
+    )
+    mock_refresh_derived_data = AsyncMock()
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.refresh_derived_data",
+        mock_refresh_derived_data,
+    )
+    with aioresponses() as mocked:
+        for link in links:
+            mocked.get(HOST + link, body=data)
+        mocked.get(HOST + missing_link, status=404)
+        async with create_client_session() as session:
+            failed = await parse_trading_results(links | {missing_link}, session)
+    assert failed == {missing_link}
+    mock_refresh_derived_data.assert_awaited_once_with(
+        {date(2024, 2, day) for day in range(10, 15)}
+    )
+    records = [
+        record for call in mock_write_to_db.await_args_list for record in call.args[0]
+    ]
+    assert sorted(record["date"] for record in records) == [
+        date(2024, 2, day) for day in range(10, 15)
+    ]
+
+
+async def test_process_bulletins_when_producer_fails(excel_data, monkeypatch):
+    monkeypatch.setattr(settings.parser, "parse_executor", "thread")
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.write_to_db",
+        AsyncMock(side_effect=lambda records: {record["date"] for record in records}),
+    )
+    mock_refresh_derived_data = AsyncMock()
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.refresh_derived_data",
+        mock_refresh_derived_data,
+    )
+
+    async def produce(queue):
+        await queue.put((excel_data.read(), "oil_xls_20240212162000.xls"))
+        raise OSError("Broken tarball")
+
+    with pytest.raises(OSError):
+        await process_bulletins(produce)
+    mock_refresh_derived_data.assert_awaited_once_with({date(2024, 2, 12)})
+
+
+async def test_refresh_derived_data_invalidates_cache_on_error(monkeypatch):
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.refresh_last_trading_results",
+        AsyncMock(side_effect=RuntimeError("snapshot failed")),
+    )
+    mock_invalidate_cached_dates = AsyncMock()
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.invalidate_cached_dates",
+        mock_invalidate_cached_dates,
+    )
+    mock_invalidate_snapshots = AsyncMock()
+    monkeypatch.setattr(
+        "src.service_layer.parser.data_parser.invalidate_snapshots",
+        mock_invalidate_snapshots,
+    )
+    await refresh_derived_data({date(2024, 2, 12)})
+    mock_invalidate_cached_dates.assert_awaited_once_with({date(2024, 2, 12)})
+    mock_invalidate_snapshots.assert_awaited_once_with(
+        last_results_snapshot, dictionaries_snapshot
+    )
@@ -0,0 +1,79 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aioresponses import aioresponses
+from yarl import URL
+
+from src.config import HOST, settings
+from src.service_layer.parser.data_parser import (
+    create_client_session,
+    fetch_bulletin,
+    parse_bulletins,
+)
+from src.service_layer.parser.file_cache import BulletinCache
+
+LINK = "/upload/reports/oil_xls/oil_xls_20240212162000.xls?r=2186"
+
+
+def test_bulletin_cache(tmp_path):
+    cache = BulletinCache(tmp_path, max_size=10)
+    cache.put("first", b"123456", etag='"1"')
+    first_path = next(tmp_path.glob("*.xls"))
+    os.utime(first_path, (0, 0))
+    assert cache.get("first").etag == '"1"'
+    os.utime(first_path, (0, 0))
+    cache.put("second", b"123456")
+    assert cache.get("first") is None
+    assert cache.get("second").data == b"123456"
+
+    cache.put("second", b"1234")
+    cache.put("third", b"123456")
+    assert cache.get("second").data == b"1234"
+    assert cache._size == 10
+    cache.remove("second")
+    assert cache.get("second") is None
+    assert cache._size == 6
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".json", ".xls"]
+
+
+async def test_parse_bulletins_removes_corrupted_file(bulletin_cache):
+    bulletin_cache.put(LINK, b"not an xls file")
+    queue, results_queue = asyncio.Queue(), asyncio.Queue()
+    await queue.put((b"not an xls file", LINK))
+    await queue.put(None)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        await parse_bulletins(queue, results_queue, executor)
+    assert results_queue.empty()
+    assert bulletin_cache.get(LINK) is None
+
+
+async def test_fetch_bulletin(bulletin_cache, monkeypatch):
+    with aioresponses() as mocked:
+        mocked.get(HOST + LINK, body=b"data", headers={"ETag": '"abc"'})
+        async with create_client_session() as session:
+            assert await fetch_bulletin(LINK, session) == b"data"
+            assert await fetch_bulletin(LINK, session) == b"data"
+        assert len(mocked.requests[("GET", URL(HOST + LINK))]) == 1
+
+    monkeypatch.setattr(settings.parser, "cache_revalidate", True)
+    with aioresponses() as mocked:
+        mocked.get(HOST + LINK, status=304)
+        async with create_client_session() as session:
+            assert await fetch_bulletin(LINK, session) == b"data"
+        request = mocked.requests[("GET", URL(HOST + LINK))][0]
+        assert request.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+
+async def test_fetch_bulletin_when_cache_fails(bulletin_cache, monkeypatch):
+    def fail(*args):
+        raise OSError("No space left on device")
+
+    bulletin_cache.put("/cached.xls", b"cached")
+    monkeypatch.setattr(bulletin_cache, "put", fail)
+    monkeypatch.setattr("src.service_layer.parser.file_cache.os.utime", fail)
+    with aioresponses() as mocked:
+        mocked.get(HOST + LINK, body=b"data")
+        async with create_client_session() as session:
+            assert await fetch_bulletin(LINK, session) == b"data"
+            assert await fetch_bulletin("/cached.xls", session) == b"cached"
@@ -0,0 +1,47 @@
+from aioresponses import aioresponses
+
+from src.config import RESULTS_URL
+from src.service_layer.parser.data_parser import create_client_session
+from src.service_layer.parser.links_parser import (
+    find_item_hrefs,
+    find_item_hrefs_with_soup,
+    get_new_trading_results_links,
+)
+
+
+def test_find_item_hrefs(listing_pages):
+    for page in listing_pages.values():
+        hrefs = find_item_hrefs(page)
+        assert len(hrefs) == 2
+        assert hrefs == find_item_hrefs_with_soup(page)
+    assert find_item_hrefs("<html><body></body></html>") is None
+
+
+def test_find_item_hrefs_stops_at_block_end(listing_page_with_aside):
+    page = listing_page_with_aside
+    hrefs = find_item_hrefs(page)
+    assert len(hrefs) == 2
+    assert hrefs == find_item_hrefs_with_soup(page)
+
+
+async def test_get_new_trading_results_links(listing_pages):
+    with aioresponses() as mocked:
+        for num, page in listing_pages.items():
+            mocked.get(f"{RESULTS_URL}?page=page-{num}", body=page)
+        async with create_client_session() as session:
+            links = await get_new_trading_results_links(session, "20240209")
+    assert links == {
+        f"/upload/reports/oil_xls/oil_xls_{date}162000.xls?r=2186"
+        for date in ["20240214", "20240213", "20240212"]
+    }
+
+
+async def test_get_links_of_missing_dates(listing_pages):
+    with aioresponses() as mocked:
+        for num, page in listing_pages.items():
+            mocked.get(f"{RESULTS_URL}?page=page-{num}", body=page)
+        async with create_client_session() as session:
+            links = await get_new_trading_results_links(
+                session, "20240209", loaded_dates={"20240214", "20240212"}
+            )
+    assert links == {"/upload/reports/oil_xls/oil_xls_20240213162000.xls?r=2186"}
@@ -0,0 +1,12 @@
+from unittest.mock import AsyncMock
+
+from src.service_layer.scheduler import create_partitions
+
+
+async def test_create_partitions_logs_errors(monkeypatch, caplog):
+    monkeypatch.setattr(
+        "src.service_layer.scheduler.create_trading_results_partitions",
+        AsyncMock(side_effect=RuntimeError("permission denied")),
+    )
+    await create_partitions()
+    assert "Error creating partitions: permission denied." in caplog.text
@@ -1,10 +1,12 @@
-from datetime import date
+from datetime import date, timedelta
 from contextlib import nullcontext as does_not_raise
 
 import pytest
 from fastapi import HTTPException
 
 from src.service_layer.utils import (
+    canonical_key_builder,
+    date_bucket,
     validate_dates_interval,
     set_filters,
     get_date_from_link,
@@ -14,29 +16,41 @@ from src.service_layer.utils import (
 @pytest.mark.parametrize(
     "start_date, end_date, expected_start_date, expected_end_date, expectation",
     [
-        (None, None, "20230101", date.today().strftime("%Y%m%d"), does_not_raise()),
-        (date(2022, 1, 1), date(2025, 2, 1), "20230101", "20250201", does_not_raise()),
-        (date(2024, 1, 1), date(2026, 1, 1), "20240101", "20260101", does_not_raise()),
+        (None, None, date(2023, 1, 1), date.today(), does_not_raise()),
         (
+            date(2022, 1, 1),
+            date(2025, 2, 1),
+            date(2023, 1, 1),
+            date(2025, 2, 1),
+            does_not_raise(),
+        ),
+        (
+            date(2024, 1, 1),
+            date(2026, 1, 1),
+            date(2024, 1, 1),
+            date(2026, 1, 1),
+            does_not_raise(),
+        ),
+        (
+            date(2025, 2, 1),
+            date(2022, 1, 1),
             date(2025, 2, 1),
             date(2022, 1, 1),
-            "20250201",
-            "20220101",
             pytest.raises(HTTPException),
         ),
         (
             "20230101",
             date(2026, 1, 1),
-            "20230101",
-            "20260101",
-            pytest.raises(AttributeError),
+            date(2023, 1, 1),
+            date(2026, 1, 1),
+            pytest.raises(TypeError),
         ),
         (
             20230101,
             date(2026, 1, 1),
-            "20230101",
-            "20260101",
-            pytest.raises(AttributeError),
+            date(2023, 1, 1),
+            date(2026, 1, 1),
+            pytest.raises(TypeError),
         ),
     ],
 )
@@ -89,3 +103,49 @@ def test_set_filters(oil_id, delivery_type_id, delivery_basis_id, filters):
 )
 def test_get_date_from_link(link, date_str):
     assert get_date_from_link(link) == date_str
+
+
+@pytest.mark.parametrize(
+    "end_date, bucket",
+    [
+        (None, "open"),
+        (date.today(), "open"),
+        (date.today() + timedelta(days=1), "open"),
+        (date(2024, 1, 1), "20240101"),
+    ],
+)
+def test_date_bucket(end_date, bucket):
+    assert date_bucket(end_date) == bucket
+
+
+def test_canonical_key_builder():
+    def get_results(filters, start_date, end_date):
+        pass
+
+    def build(**kwargs):
+        return canonical_key_builder(get_results, "ns", kwargs=kwargs)
+
+    key = build(
+        filters={"oil_id": "A100", "delivery_type_id": "F"},
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 2, 1),
+    )
+    assert key == build(
+        end_date=date(2024, 2, 1),
+        filters={"delivery_type_id": "F", "oil_id": "A100"},
+        start_date=date(2024, 1, 1),
+    )
+    assert key != build(
+        filters={"oil_id": "A100"},
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 2, 1),
+    )
+    assert key.startswith("ns:20240201:")
+    assert len(key) == len("ns:20240201:") + 64
+    assert build(
+        filters={}, start_date=date(2024, 1, 1), end_date=date.today()
+    ).startswith("ns:open:")
+    assert build(group_by=["oil_id", "date", "oil_id"]) == build(
+        group_by=["date", "oil_id"]
+    )
+    assert build(group_by=["date"]) != build(group_by=["date", "oil_id"])